@@ -0,0 +1,248 @@
+"""Admission control and backpressure for IVR calls.
+
+New calls are admitted at /ivr/start only while the number of active
+sessions (with a turn in the last SESSION_IDLE_S, so abandoned calls don't
+hold a line) is under MAX_ACTIVE_SESSIONS and the ASR and TTS queues have room;
+otherwise the caller is told to call back, immediately, instead of joining
+a backlog that would time out for everyone.
+
+Each slow stage (ASR, TTS) runs behind an AdaptiveLimiter: at most `limit`
+calls in flight, up to max_queue waiting, and waiters that cannot start
+within queue_timeout (or before the turn's deadline) are turned away. The limit adapts to the stage's
+observed latency (additive increase while latency is under target,
+multiplicative decrease when it goes over), so a slowing provider gets less
+concurrent load rather than more. Limits are per worker process.
+
+Settings come from the environment:
+
+    MAX_ACTIVE_SESSIONS        calls in progress before new calls are refused (default 200)
+    CALL_BACK_AFTER_S          Retry-After for refused calls (default 60)
+    SESSION_IDLE_S             silence after which a session stops counting as active (default 300)
+    <STAGE>_CONCURRENCY        starting in-flight limit, e.g. ASR_CONCURRENCY (default 16)
+    <STAGE>_MAX_CONCURRENCY    ceiling for the adaptive limit (default 64)
+    <STAGE>_QUEUE              waiters allowed beyond the limit (default 64)
+    <STAGE>_QUEUE_TIMEOUT_S    longest wait for a slot (default 10)
+    <STAGE>_TARGET_LATENCY_S   latency above which the limit shrinks (ASR 3, TTS 2)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+from metrics import Counter, Gauge
+from resilience import time_left
+
+MAX_ACTIVE_SESSIONS = int(os.getenv("MAX_ACTIVE_SESSIONS", "200"))
+CALL_BACK_AFTER_S = int(os.getenv("CALL_BACK_AFTER_S", "60"))
+SESSION_IDLE_S = float(os.getenv("SESSION_IDLE_S", "300"))
+
+CALLS_REFUSED = Counter(
+    "ivr_calls_refused_total",
+    "New calls told to call back, by the reason they were refused.",
+    ["reason"],
+)
+
+WORK_REFUSED = Counter(
+    "ivr_admission_rejected_total",
+    "Stage calls refused because the queue was full or the wait too long.",
+    ["stage"],
+)
+
+
+class OverCapacity(Exception):
+    """Raised when a call or a unit of work is refused; retry_after is in seconds."""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"{stage} over capacity")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """In-flight limit with a bounded FIFO queue, adjusted by observed latency."""
+
+    def __init__(self, stage: str, limit: int = 8, min_limit: int = 1, max_limit: int = 32,
+                 max_queue: int = 32, queue_timeout: float = 10.0, target_latency: float = 2.0):
+        self.stage = stage
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.rejected = 0
+        self.latency = 0.0  # Moving average of completed calls, seconds
+        self._waiters = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """True when new work would be refused rather than queued."""
+        return self.queued >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current queue has drained."""
+        per_slot = self.latency or self.target_latency
+        return max(1, math.ceil(per_slot * (self.queued + 1) / max(1, int(self.limit))))
+
+    async def run(self, func, *args, **kwargs):
+        """Run blocking func in the threadpool once a slot is free."""
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            return await run_in_threadpool(func, *args, **kwargs)
+        finally:
+            self._record(time.perf_counter() - started)
+            self._release()
+
+    async def _acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if self.saturated:
+            self.rejected += 1
+            WORK_REFUSED.inc(stage=self.stage)
+            raise OverCapacity(self.stage, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The releasing call hands its slot over by resolving the future;
+            # don't wait longer than the turn has left
+            await asyncio.wait_for(waiter, max(0.0, time_left(self.queue_timeout)))
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.rejected += 1
+            WORK_REFUSED.inc(stage=self.stage)
+            raise OverCapacity(self.stage, self.retry_after())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _record(self, latency: float):
+        self.latency = latency if not self.latency else 0.8 * self.latency + 0.2 * latency
+        now = time.monotonic()
+        if latency > self.target_latency:
+            # At most one decrease per round trip, so one slow burst isn't counted many times
+            if now - self._last_decrease > self.latency:
+                self.limit = max(self.min_limit, self.limit * 0.75)
+                self._last_decrease = now
+        elif self.in_flight >= int(self.limit) or self._waiters:
+            # Fully used and fast: grow by about one slot per limit's worth of completions
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def state(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "latency_s": round(self.latency, 3),
+            "target_latency_s": self.target_latency,
+        }
+
+
+def limiter_from_env(stage: str, target_latency: float) -> AdaptiveLimiter:
+    prefix = stage.upper()
+    return AdaptiveLimiter(
+        stage,
+        limit=int(os.getenv(f"{prefix}_CONCURRENCY", "16")),
+        max_limit=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "64")),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", "64")),
+        queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT_S", "10")),
+        target_latency=float(os.getenv(f"{prefix}_TARGET_LATENCY_S", str(target_latency))),
+    )
+
+
+LIMITERS = {
+    "asr": limiter_from_env("asr", target_latency=3.0),
+    "tts": limiter_from_env("tts", target_latency=2.0),
+}
+
+
+_admit_lock = threading.Lock()
+
+
+def active_sessions(store) -> int:
+    """Sessions with a turn in the last SESSION_IDLE_S, from a session store."""
+    return store.count(SESSION_IDLE_S)
+
+
+def admit_call(count_sessions, start_call):
+    """
+    Start a new call, or raise OverCapacity if the caller should call back.
+
+    Counting sessions and starting the call happen under one lock, so a burst
+    of simultaneous calls cannot all see room for themselves. Blocking; run it
+    in the threadpool.
+    """
+    with _admit_lock:
+        if count_sessions() >= MAX_ACTIVE_SESSIONS:
+            CALLS_REFUSED.inc(reason="sessions")
+            raise OverCapacity("sessions", CALL_BACK_AFTER_S)
+        for stage, limiter in LIMITERS.items():
+            if limiter.saturated:
+                CALLS_REFUSED.inc(reason=stage)
+                raise OverCapacity(stage, max(limiter.retry_after(), CALL_BACK_AFTER_S))
+        return start_call()
+
+
+def threadpool_size() -> int:
+    """Worker threads needed for every stage at its ceiling, plus room for other blocking calls."""
+    return sum(limiter.max_limit for limiter in LIMITERS.values()) + 16
+
+
+def state(active_sessions: int) -> dict:
+    """Admission state for autoscaling: utilisation near or above 1 means add capacity."""
+    stages = {stage: limiter.state() for stage, limiter in LIMITERS.items()}
+    utilisation = max(
+        [active_sessions / MAX_ACTIVE_SESSIONS]
+        + [(s["in_flight"] + s["queued"]) / max(1, s["limit"]) for s in stages.values()]
+    )
+    return {
+        "sessions": {"active": active_sessions, "max": MAX_ACTIVE_SESSIONS},
+        "stages": stages,
+        "utilisation": round(utilisation, 3),
+        "accepting_calls": active_sessions < MAX_ACTIVE_SESSIONS
+                           and not any(limiter.saturated for limiter in LIMITERS.values()),
+    }
+
+
+def _per_stage(value):
+    return lambda: {(stage,): value(limiter) for stage, limiter in LIMITERS.items()}
+
+
+Gauge("ivr_admission_limit", "Current adaptive in-flight limit per stage.", ["stage"],
+      function=_per_stage(lambda limiter: int(limiter.limit)))
+Gauge("ivr_admission_in_flight", "Calls in flight per stage.", ["stage"],
+      function=_per_stage(lambda limiter: limiter.in_flight))
+Gauge("ivr_admission_queued", "Calls waiting for a slot per stage.", ["stage"],
+      function=_per_stage(lambda limiter: limiter.queued))
@@ -1,24 +1,112 @@
-from fastapi import FastAPI, UploadFile, File, Form, Body
+from fastapi import FastAPI, UploadFile, File, Form, Body, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, PlainTextResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
+import anyio
+import asyncio
+import importlib
+import logging
 import os
 import tempfile
+from contextlib import asynccontextmanager
+from xml.sax.saxutils import quoteattr
 from pydantic import BaseModel
 
-from transcribe_module import transcribe_audio
-from ivr_handler import process_turn, reset_session, get_initial_question
+import admission
+import metrics
+import twilio_auth
+from admission import LIMITERS, OverCapacity
+from language_config import CAPACITY_MESSAGES
+from logging_config import setup_logging
+from metrics import span, turn_labels
+from resilience import deadline, ServiceError, TranscriptionError, TURN_BUDGET_S
+from transcribe_module import transcribe_audio, get_speech_client
+from tts_module import synthesize_pcm, get_client as get_tts_client
+from ivr_handler import (
+    process_turn, repeat_turn, reset_session, get_initial_question, get_session, synthesize_speech,
+    cached_prompt, application_saved, SESSION_STORE, AUDIO_STORE,
+)
 from data_handler import insert_record_handler
+from media_stream import MediaStreamCall
 from database import (
+    get_client as get_database_client,
     get_employer_by_id,
     add_employer_profile,
     add_employer_login,
     checklogin,
-    get_masons,
+    get_masons_since,
+    get_masons_by_ids,
+    get_employer_profile as get_employer_profile_row,
     update_contact_status,
 )
-
-app = FastAPI(title="Mason IVR Backend", version="1.0.0")
+from applicant_index import APPLICANT_INDEX, INDEX_SYNC_INTERVAL_S
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# SDK clients and the applicant index are loaded lazily; after startup they
+# are warmed in the background (failed ones retried with backoff) and /ready
+# reports on them
+WARM_UP_RETRY_S = float(os.getenv("WARM_UP_RETRY_S", "1"))
+WARM_UP_MAX_RETRY_S = float(os.getenv("WARM_UP_MAX_RETRY_S", "60"))
+WARM_UP = {
+    "database": get_database_client,
+    "speech": get_speech_client,
+    "openai_tts": get_tts_client,
+    "gtts": lambda: importlib.import_module("gtts"),
+    "applicant_index": lambda: APPLICANT_INDEX.sync(get_masons_since, force=True),
+}
+READINESS = {name: "pending" for name in WARM_UP}
+
+
+async def warm_up():
+    """
+    Load every client once so the first caller doesn't pay for it.
+
+    A failed load (a network blip, credentials not mounted yet) is retried
+    with exponential backoff until it succeeds, so /ready recovers on its own.
+    """
+    pending = dict(WARM_UP)
+    delay = WARM_UP_RETRY_S
+    while True:
+        for name, load in list(pending.items()):
+            try:
+                await run_in_threadpool(load)
+                READINESS[name] = "ok"
+                del pending[name]
+            except Exception as e:
+                READINESS[name] = f"error: {e}"
+                logger.warning("Warm-up of %s failed, retrying in %.0fs: %s", name, delay, e)
+        if not pending:
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, WARM_UP_MAX_RETRY_S)
+
+
+async def sync_applicant_index():
+    """Pull rows other workers saved into the applicant index every INDEX_SYNC_INTERVAL_S."""
+    while True:
+        await asyncio.sleep(INDEX_SYNC_INTERVAL_S)
+        try:
+            await run_in_threadpool(APPLICANT_INDEX.sync, get_masons_since, True)
+        except Exception as e:
+            logger.warning("Applicant index sync failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Blocking ASR/TTS calls run on the threadpool; size it for the stage limits
+    anyio.to_thread.current_default_thread_limiter().total_tokens = admission.threadpool_size()
+    tasks = [asyncio.create_task(warm_up()), asyncio.create_task(sync_applicant_index())]
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(title="Mason IVR Backend", version="1.0.0", lifespan=lifespan)
+
+metrics.ACTIVE_SESSIONS.set_function(lambda: admission.active_sessions(SESSION_STORE))
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -33,10 +121,33 @@ app.add_middleware(
 # ==================== Health Check ====================
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Liveness probe: the process is up and serving requests."""
     return {"status": "ok", "service": "Mason IVR Backend"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once every dependency client has loaded, else 503."""
+    is_ready = all(state == "ok" for state in READINESS.values())
+    return JSONResponse(
+        {"status": "ready" if is_ready else "not_ready", "dependencies": READINESS},
+        status_code=200 if is_ready else 503,
+    )
+
+
+@app.get("/admission")
+async def admission_state():
+    """Active sessions and per-stage limits, queues and latency, for autoscaling."""
+    return admission.state(await run_in_threadpool(admission.active_sessions, SESSION_STORE))
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency histograms, active sessions, cache hit ratios."""
+    # Rendering counts active sessions, which may query the session store
+    return PlainTextResponse(await run_in_threadpool(metrics.render), media_type="text/plain; version=0.0.4")
+
+
 # ==================== Models ====================
 class EmployerSignup(BaseModel):
     """Request model for employer signup."""
@@ -48,73 +159,164 @@ class EmployerSignup(BaseModel):
 
 
 # ==================== IVR Endpoints ====================
+def over_capacity_response(error: OverCapacity, language: str, message: str):
+    """503 with a spoken-style message and Retry-After, returned without queueing."""
+    text = CAPACITY_MESSAGES.get(language, CAPACITY_MESSAGES["en"])[message]
+    logger.warning("Over capacity", extra={"stage": error.stage, "retry_after": error.retry_after})
+    return JSONResponse(
+        {
+            "status": "busy",
+            "detail": text,
+            "assistant_text": text,
+            "audio_url": None,
+            "finished": message == "call_back",
+            "retry_after": error.retry_after,
+        },
+        status_code=503,
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def prompt_audio_url(text: str, language: str) -> str:
+    """Synthesize (or reuse) a prompt and return the URL it is served from."""
+    return AUDIO_STORE.publish(synthesize_speech(text, language))
+
+
+# Prompts being synthesized, so concurrent requests for the same one share it
+_rendering = {}
+
+
+async def synthesize_prompt(text: str, language: str):
+    """Prompt audio URL, or None when TTS is over capacity or failing; the text is shown either way."""
+    cached = cached_prompt(text, language)
+    if cached:
+        # Repeated prompts don't queue behind TTS work
+        return AUDIO_STORE.publish(cached)
+
+    key = (language, text)
+    if key in _rendering:
+        return await asyncio.shield(_rendering[key])
+    _rendering[key] = rendered = asyncio.get_running_loop().create_future()
+    url = None
+    try:
+        url = await LIMITERS["tts"].run(prompt_audio_url, text, language)
+    except OverCapacity:
+        logger.warning("TTS over capacity, replying without audio", extra={"language": language})
+    except ServiceError as e:
+        logger.warning("TTS failed, replying without audio: %s", e, extra={"language": language})
+    except Exception as e:
+        rendered.set_exception(e)
+        rendered.exception()  # Marks it retrieved when no one else was waiting
+        raise
+    finally:
+        del _rendering[key]
+        if not rendered.done():
+            # Also when this request was cancelled (the caller hung up): the
+            # others waiting on it reply without audio instead of hanging
+            rendered.set_result(url)
+    return url
+
+
 @app.post("/ivr")
 async def ivr_endpoint(session_id: str = Form(...), file: UploadFile = File(...)):
     """Process IVR audio input and return assistant response."""
     try:
-        print(f"[DEBUG] IVR Request - session_id: {session_id}, file: {file.filename if file else 'None'}")
-        
+        logger.debug("IVR request", extra={"session_id": session_id, "upload": file.filename if file else None})
+
         # Validate inputs
         if not session_id:
             return {"status": "error", "message": "session_id is required"}
         if not file:
             return {"status": "error", "message": "file is required"}
         
-        # Save temporary audio file
-        suffix = os.path.splitext(file.filename)[-1] or ".webm"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            print(f"[DEBUG] File size: {len(content)} bytes")
-            
-            if len(content) == 0:
-                return {"status": "error", "message": "Audio file is empty"}
-            
-            tmp.write(content)
-            temp_audio_path = tmp.name
-
-        # Get language from session for transcription
-        from ivr_handler import SESSIONS
+        # Get language and current question from session for transcription and metrics
         from language_config import LANGUAGE_CODES
-        session_language = SESSIONS.get(session_id, {}).get("language", "en")
+        session = await run_in_threadpool(get_session, session_id)
+        session_language = session.get("language", "en") if session else "en"
         language_code = LANGUAGE_CODES.get(session_language, "en-IN")
-        
-        # Transcribe audio with language-specific model
-        print(f"[DEBUG] Transcribing audio from {temp_audio_path} (language: {session_language})")
-        user_text = transcribe_audio(temp_audio_path, language_code)
-        print(f"[DEBUG] ===== TRANSCRIBED TEXT: '{user_text}' =====")
-        print(f"[DEBUG] Text length: {len(user_text)}, Text repr: {repr(user_text)}")
 
-        # Process user input through IVR logic
-        print(f"[DEBUG] Calling process_turn with session_id={session_id}, user_text='{user_text}'")
-        result = process_turn(session_id, user_text)
-        print(f"[DEBUG] process_turn returned: {result}")
+        current_field = session.get("current_field", "") if session else ""
 
+        # Every service call below takes its timeout from what is left of the turn's budget
+        with deadline(TURN_BUDGET_S), turn_labels(session_language, current_field):
+            # Save temporary audio file
+            suffix = os.path.splitext(file.filename)[-1] or ".webm"
+            with span("upload_read"):
+                content = await file.read()
+
+            if len(content) == 0:
+                return {"status": "error", "message": "Audio file is empty"}
 
-        # Save to database if session is finished
-        if result["finished"]:
-            insert_record_handler(result["fields"])
+            with span("disk_write"):
+                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                    tmp.write(content)
+                    temp_audio_path = tmp.name
+
+            # Transcribe audio with language-specific model; nothing has changed
+            # yet, so an over-capacity caller can simply say it again
+            try:
+                with span("asr"):
+                    transcription = await LIMITERS["asr"].run(transcribe_audio, temp_audio_path, language_code)
+            except OverCapacity as e:
+                return over_capacity_response(e, session_language, "busy_retry")
+            except TranscriptionError as e:
+                logger.warning("Transcription failed, asking again: %s", e, extra={"session_id": session_id})
+                transcription = None
+            finally:
+                os.remove(temp_audio_path)
+
+            if transcription is None:
+                # The error is not an answer: repeat the question, session unchanged
+                user_text, confidence = "", None
+                result = await run_in_threadpool(repeat_turn, session_id, session=session, synthesize=False)
+            else:
+                user_text, confidence = transcription.text, transcription.confidence
+                logger.debug("Transcribed upload", extra={
+                    "session_id": session_id, "bytes": len(content),
+                    "transcript": user_text, "confidence": confidence,
+                })
+
+                # Process user input through IVR logic
+                result = await run_in_threadpool(
+                    process_turn, session_id, user_text, confidence,
+                    synthesize=False, session=session,
+                )
+            logger.debug("Turn processed", extra={
+                "session_id": session_id, "finished": result["finished"], "fields": result["fields"],
+            })
+
+            # Save to database if session is finished; if that fails the answers stay resumable
+            if result["finished"]:
+                with span("db_insert"):
+                    await run_in_threadpool(insert_record_handler, result["fields"], result["resume_token"])
+                await run_in_threadpool(application_saved, result["resume_token"])
+                result["resume_token"] = None
+
+            audio_url = await synthesize_prompt(result["assistant_text"], session_language)
 
         return {
             "status": "success",
             "user_text": user_text,  # Add for debugging
+            "confidence": confidence,
             "assistant_text": result["assistant_text"],
             "finished": result["finished"],
             "fields": result["fields"],
-            "audio_url": f"/audio/{os.path.basename(result['audio_file'])}"
+            "audio_url": audio_url,
+            "resume_token": result["resume_token"]
         }
 
     except Exception as e:
-        print(f"[ERROR] IVR endpoint error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("IVR endpoint error", extra={"session_id": session_id})
         return {"status": "error", "message": str(e)}
 
 
 # ==================== Audio Endpoint ====================
 @app.get("/audio/{file_name}")
 async def get_audio(file_name: str):
-    """Serve temporary audio files."""
-    file_path = os.path.join(tempfile.gettempdir(), file_name)
+    """Serve synthesized prompt audio from the local audio store."""
+    file_path = AUDIO_STORE.open(file_name)
+    if file_path is None:
+        return JSONResponse({"status": "error", "message": "Audio not found"}, status_code=404)
     return FileResponse(file_path, media_type="audio/mpeg")
 
 
@@ -122,40 +324,90 @@ async def get_audio(file_name: str):
 @app.post("/reset")
 async def reset(session_id: str = Form(...)):
     """Reset IVR session."""
-    reset_session(session_id)
+    await run_in_threadpool(reset_session, session_id)
     return {"status": "success", "message": "Session reset"}
 
 
 @app.post("/ivr/start")
 async def ivr_start(
     session_id: str = Form(...),
-    language: str = Form(default="en")
+    language: str = Form(default="en"),
+    resume_token: str = Form(default=None)
 ):
-    """Get initial welcome message and first question without audio input."""
+    """
+    Get initial welcome message and first question without audio input.
+
+    resume_token is the token returned by an earlier call that dropped; the
+    caller is then offered to continue from that call's answers.
+    """
     try:
-        print(f"[DEBUG] IVR Start - session_id: {session_id}, language: {language}")
-        
-        # Get initial question in selected language
-        result = get_initial_question(session_id, language)
-        
-        # Save audio file and return URL
-        audio_file = result["audio_file"]
-        audio_filename = os.path.basename(audio_file)
-        audio_url = f"/audio/{audio_filename}"
-        
-        print(f"[DEBUG] Initial question generated, audio: {audio_url}")
-        
+        logger.debug("IVR start", extra={"session_id": session_id, "language": language})
+
+        # Get initial question in selected language, unless over capacity
+        with turn_labels(language, "name"):
+            try:
+                result = await run_in_threadpool(
+                    admission.admit_call, lambda: admission.active_sessions(SESSION_STORE),
+                    lambda: get_initial_question(session_id, language, synthesize=False,
+                                                 resume_token=resume_token),
+                )
+            except OverCapacity as e:
+                return over_capacity_response(e, language, "call_back")
+            audio_url = await synthesize_prompt(result["assistant_text"], language)
+
         return {
             "assistant_text": result["assistant_text"],
             "audio_url": audio_url,
             "finished": result["finished"],
-            "fields": result["fields"]
+            "fields": result["fields"],
+            "resume_token": result["resume_token"]
         }
     except Exception as e:
-        print(f"[ERROR] IVR Start failed: {str(e)}")
+        logger.exception("IVR start failed", extra={"session_id": session_id})
         return {"status": "error", "message": str(e)}
 
 
+# ==================== Phone Call Endpoints ====================
+@app.post("/twilio/voice")
+async def twilio_voice(request: Request, language: str = "en"):
+    """Twilio voice webhook: connect the call to the media stream endpoint."""
+    form = await request.form()
+    # Twilio signs the URL it called; behind a proxy that is the public https one
+    url = request.url.replace(scheme=request.headers.get("x-forwarded-proto", request.url.scheme))
+    if not twilio_auth.valid_request(str(url), dict(form), request.headers.get("x-twilio-signature")):
+        logger.warning("Rejected unsigned Twilio webhook")
+        return Response(status_code=403)
+
+    caller = form.get("From", "")
+    token = twilio_auth.stream_token(form.get("CallSid", ""), caller, language)
+    stream_url = f"wss://{request.headers.get('host')}/media-stream"
+    twiml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<Response><Connect>"
+        f"<Stream url={quoteattr(stream_url)}>"
+        f'<Parameter name="language" value={quoteattr(language)}/>'
+        f'<Parameter name="caller" value={quoteattr(caller)}/>'
+        f'<Parameter name="token" value={quoteattr(token)}/>'
+        "</Stream>"
+        "</Connect></Response>"
+    )
+    return Response(content=twiml, media_type="application/xml")
+
+
+@app.websocket("/media-stream")
+async def media_stream(websocket: WebSocket):
+    """Twilio Media Streams: 8 kHz μ-law caller audio in, IVR prompts out."""
+    await websocket.accept()
+    call = MediaStreamCall(
+        websocket,
+        transcribe=transcribe_audio,
+        synthesize=synthesize_pcm,
+        save_record=insert_record_handler,
+        authorize=twilio_auth.valid_stream,
+    )
+    await call.run()
+
+
 # ==================== Employer Endpoints ====================
 @app.post("/employer/login")
 async def employer_login(email: str = Form(...), password: str = Form(...)):
@@ -192,10 +444,20 @@ def get_employer_profile(emp_id: str):
 
 
 @app.get("/employer/{emp_id}/masons")
-def get_masons_for_employer(emp_id: str):
-    """Get all collected masons (currently not filtered by employer)."""
-    masons = get_masons()
-    return {"masons": masons}
+def get_masons_for_employer(emp_id: str, limit: int = 50, min_age: int = None, max_age: int = None):
+    """
+    Get the masons that best fit the employer, best first.
+
+    Ranked by the applicant index on the profile's location and expected
+    wage; without a profile, the most recent applicants are returned. The
+    index is loaded and kept in sync in the background, never here.
+    """
+    limit = max(1, min(limit, 500))
+    profile = get_employer_profile_row(emp_id) or {}
+    ids = APPLICANT_INDEX.top(
+        profile.get("location", ""), profile.get("expected_wage"), limit, min_age=min_age, max_age=max_age,
+    )
+    return {"masons": get_masons_by_ids(ids)}
 
 
 @app.put("/masons/{mason_id}/status")
@@ -0,0 +1,164 @@
+"""Ranked applicant search for employers.
+
+Employers see the masons that best fit their profile instead of the whole
+calls table. Each worker keeps an in-memory SQLite index of the applicants:
+an FTS5 table over the address for location matching, and plain columns
+with B-tree indexes on pay and age. New records are added as insert_record
+saves them, and rows saved by other workers are pulled in by id (every
+INDEX_SYNC_INTERVAL_S at most), so the full table is only read once.
+
+Applicants whose address mentions the employer's location rank first; in
+each group, pay closer to the employer's expected wage ranks higher. Both
+orders come from index scans (the FTS5 match, then outward walks on the
+pay index), so top-K reads about K rows plus the location matches, not
+the whole table.
+
+The index holds only what ranking needs; the top-K rows themselves are fetched from the database, so contact status
+is always current.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+INDEX_SYNC_INTERVAL_S = float(os.getenv("INDEX_SYNC_INTERVAL_S", "30"))
+SYNC_BATCH = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def _to_int(value):
+    """Integer from a stored value such as "25000" or 32; None if there isn't one."""
+    if value is None:
+        return None
+    digits = re.sub(r"[^\d]", "", str(value))
+    return int(digits) if digits else None
+
+
+def location_query(location: str):
+    """FTS5 query matching any word of the location, or None when it has none."""
+    words = _WORD.findall(location or "")
+    if not words:
+        return None
+    return " OR ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+class ApplicantIndex:
+    """In-memory FTS and numeric index over the calls table."""
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE applicants (id INTEGER PRIMARY KEY, pay INTEGER, age INTEGER);
+            CREATE INDEX applicants_pay ON applicants (pay);
+            CREATE INDEX applicants_age ON applicants (age);
+            CREATE VIRTUAL TABLE applicant_text USING fts5(address, tokenize="unicode61 remove_diacritics 0");
+            """
+        )
+        self._lock = threading.Lock()  # Queries run on the threadpool
+        self.last_id = 0
+        self._last_sync = 0.0
+
+    def add(self, row: dict):
+        """Index a calls row, replacing any earlier version of it."""
+        with self._lock:
+            self._add(row)
+
+    def _add(self, row: dict):
+        applicant_id = int(row["id"])
+        self._conn.execute(
+            "INSERT OR REPLACE INTO applicants (id, pay, age) VALUES (?, ?, ?)",
+            (applicant_id, _to_int(row.get("pay")), _to_int(row.get("age"))),
+        )
+        self._conn.execute("DELETE FROM applicant_text WHERE rowid = ?", (applicant_id,))
+        self._conn.execute(
+            "INSERT INTO applicant_text (rowid, address) VALUES (?, ?)", (applicant_id, row.get("address") or "")
+        )
+        self.last_id = max(self.last_id, applicant_id)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM applicants").fetchone()[0]
+
+    def sync(self, fetch_since, force: bool = False):
+        """
+        Add rows saved since the last sync (by this or any other worker).
+
+        fetch_since(last_id, limit) returns calls rows with id > last_id in id
+        order. Runs at most every INDEX_SYNC_INTERVAL_S unless force is set.
+        """
+        if not force and time.time() - self._last_sync < INDEX_SYNC_INTERVAL_S:
+            return
+        self._last_sync = time.time()
+        while True:
+            rows = fetch_since(self.last_id, SYNC_BATCH)
+            with self._lock:
+                for row in rows:
+                    self._add(row)
+            if len(rows) < SYNC_BATCH:
+                break
+
+    def top(self, location: str = "", expected_wage=None, k: int = 50,
+            min_age: int = None, max_age: int = None) -> list:
+        """
+        Ids of the k best-fitting applicants, best first.
+
+        Applicants whose address matches the location come first, then the
+        rest; within each group, pay closest to expected_wage first (newest
+        first without a wage), applicants with no pay last.
+        """
+        wage = _to_int(expected_wage)
+        match = location_query(location)
+        age_filter, age_args = "", []
+        if min_age is not None:
+            age_filter += " AND a.age >= ?"
+            age_args.append(min_age)
+        if max_age is not None:
+            age_filter += " AND a.age <= ?"
+            age_args.append(max_age)
+
+        with self._lock:
+            ranked = []
+            if match:
+                if wage:
+                    order, order_args = "a.pay IS NULL, ABS(a.pay - ?), a.id DESC", [wage]
+                else:
+                    order, order_args = "a.id DESC", []
+                ranked = [row[0] for row in self._conn.execute(
+                    "SELECT a.id FROM applicant_text t JOIN applicants a ON a.id = t.rowid "
+                    f"WHERE applicant_text MATCH ? {age_filter} ORDER BY {order} LIMIT ?",
+                    [match] + age_args + order_args + [k],
+                )]
+            if len(ranked) < k:
+                # Every location match is already in ranked
+                ranked += self._nearest_pay(wage, k - len(ranked), set(ranked), age_filter, age_args)
+        return ranked
+
+    def _nearest_pay(self, wage, k: int, exclude: set, age_filter: str, age_args: list) -> list:
+        """Up to k applicants not in exclude, closest pay first (newest first without a wage)."""
+        def scan(sql, *args):
+            fetched = self._conn.execute(sql, list(args) + age_args + [k + len(exclude)]).fetchall()
+            return [row for row in fetched if row[0] not in exclude]
+
+        if not wage:
+            rows = scan(f"SELECT a.id FROM applicants a WHERE 1 {age_filter} ORDER BY a.id DESC LIMIT ?")
+            return [row[0] for row in rows[:k]]
+
+        # Walk outwards from the wage in both directions on the pay index
+        below = scan(f"SELECT a.id, ? - a.pay FROM applicants a WHERE a.pay <= ? {age_filter} "
+                     "ORDER BY a.pay DESC, a.id DESC LIMIT ?", wage, wage)
+        above = scan(f"SELECT a.id, a.pay - ? FROM applicants a WHERE a.pay > ? {age_filter} "
+                     "ORDER BY a.pay ASC, a.id DESC LIMIT ?", wage, wage)
+        nearest = [row[0] for row in sorted(below + above, key=lambda row: (row[1], -row[0]))]
+        if len(nearest) < k:
+            unpaid = scan(f"SELECT a.id FROM applicants a WHERE a.pay IS NULL {age_filter} "
+                          "ORDER BY a.id DESC LIMIT ?")
+            nearest += [row[0] for row in unpaid]
+        return nearest[:k]
+
+
+APPLICANT_INDEX = ApplicantIndex()
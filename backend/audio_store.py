@@ -0,0 +1,78 @@
+"""Where synthesized prompt audio is kept so any worker can serve it.
+
+AUDIO_BACKEND chooses the store:
+
+    local      files in AUDIO_DIR (default: the system temp dir), served by
+               GET /audio/{file_name}. Workers on one machine share it; for
+               several machines, point AUDIO_DIR at a shared volume.
+    supabase   files uploaded to the AUDIO_BUCKET storage bucket and served
+               from its public URL, so no worker has to hold them.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+URL_CACHE_SIZE = 1024
+
+
+class LocalAudioStore:
+    """Audio files in a directory, served by the /audio endpoint."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def new_path(self, suffix: str = ".mp3") -> str:
+        """Path of a new, empty file in the store for the caller to write."""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=self.directory) as tmp:
+            return tmp.name
+
+    def publish(self, path: str) -> str:
+        """URL the frontend fetches the audio from."""
+        return f"/audio/{os.path.basename(path)}"
+
+    def open(self, file_name: str):
+        """Local path of a stored file, or None if it is not in the store."""
+        path = os.path.join(self.directory, os.path.basename(file_name))
+        return path if os.path.isfile(path) else None
+
+
+class SupabaseAudioStore(LocalAudioStore):
+    """Audio uploaded to Supabase Storage; files are staged locally first."""
+
+    def __init__(self, bucket: str, directory: str):
+        super().__init__(directory)
+        self.bucket = bucket
+        self._urls = OrderedDict()  # local path -> public URL; cached prompts are uploaded once
+        self._lock = threading.Lock()
+
+    def publish(self, path: str) -> str:
+        url = self._urls.get(path)
+        if url is None:
+            from database import get_client, supabase_call
+
+            storage = get_client().storage.from_(self.bucket)
+            name = os.path.basename(path)
+            with open(path, "rb") as audio_file:
+                # An upsert can safely be repeated after a timeout
+                upload = supabase_call()(storage.upload)
+                upload(name, audio_file.read(), {"content-type": "audio/mpeg", "upsert": "true"})
+            url = storage.get_public_url(name)
+            with self._lock:
+                self._urls[path] = url
+                if len(self._urls) > URL_CACHE_SIZE:
+                    self._urls.popitem(last=False)
+        return url
+
+
+def get_audio_store():
+    """Audio store selected by AUDIO_BACKEND."""
+    backend = os.getenv("AUDIO_BACKEND", "local")
+    directory = os.getenv("AUDIO_DIR") or tempfile.gettempdir()
+    if backend == "local":
+        return LocalAudioStore(directory)
+    if backend == "supabase":
+        return SupabaseAudioStore(os.getenv("AUDIO_BUCKET", "ivr-audio"), directory)
+    raise ValueError(f"Unknown AUDIO_BACKEND: {backend!r} (expected local or supabase)")
@@ -3,9 +3,10 @@
 from database import insert_record
 
 
-def insert_record_handler(fields: dict):
-    """Insert collected IVR fields into database."""
+def insert_record_handler(fields: dict, call_id: str = None):
+    """Insert collected IVR fields into database; call_id makes repeated saves of one call idempotent."""
     insert_record(
+        call_id=call_id,
         name=fields.get("name"),
         number=fields.get("number"),
         address=fields.get("address"),
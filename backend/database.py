@@ -1,11 +1,18 @@
 # supabase_db.py
 """Database functions for Mason IVR system."""
 
-from supabase import create_client
+import functools
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import bcrypt
 import uuid
+from datetime import datetime, timezone
+
+from applicant_index import APPLICANT_INDEX
+from dedup import DEDUP_WINDOW_S, merge_record, normalize_phone, same_applicant
+from resilience import BREAKERS, DatabaseError, ServiceError, retrying
 
 # Load environment variables from .env (works locally and on Render)
 load_dotenv()
@@ -13,28 +20,137 @@ load_dotenv()
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 
-# Initialize Supabase client once
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# HTTP timeout for queries and storage uploads (the SDK defaults to 120 s)
+SUPABASE_TIMEOUT_S = float(os.environ.get("SUPABASE_TIMEOUT_S", "5"))
+SUPABASE_ATTEMPTS = int(os.environ.get("SUPABASE_ATTEMPTS", "3"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Supabase client, created once on first use.
+
+    Importing this module needs neither the supabase SDK loaded nor the
+    SUPABASE_* variables set; a missing configuration surfaces on first query.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import ClientOptions, create_client
+                options = ClientOptions(
+                    postgrest_client_timeout=SUPABASE_TIMEOUT_S,
+                    storage_client_timeout=SUPABASE_TIMEOUT_S,
+                )
+                _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, options=options)
+    return _client
+
+
+def _not_sent(error: Exception) -> bool:
+    """The request never reached Supabase, so even a write is safe to repeat."""
+    import httpx
+
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
 
-def insert_record(name=None, number=None, address=None, pay=None, age=None, 
-                  contact_status="Pending", transcription=None):
-    """Insert a new call record into the calls table."""
+def _transient(error: Exception) -> bool:
+    import httpx
+
+    return isinstance(error, httpx.TransportError)
+
+
+def supabase_call(retry_on=_transient):
+    """
+    Run a query function through the Supabase breaker, retrying errors that
+    match retry_on while the turn deadline allows.
+
+    Reads retry any transport error; writes pass retry_on=_not_sent so a
+    row is never inserted twice. Failures raise DatabaseError.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                with BREAKERS["supabase"].guard():
+                    for attempt in retrying(retry_on, SUPABASE_ATTEMPTS):
+                        with attempt:
+                            return func(*args, **kwargs)
+            except ServiceError as e:
+                raise DatabaseError("supabase", str(e)) from e
+            except Exception as e:
+                raise DatabaseError("supabase", f"{func.__name__} failed: {e}") from e
+        return wrapper
+    return decorator
+
+
+def insert_record(name=None, number=None, address=None, pay=None, age=None,
+                  contact_status="Pending", transcription=None, call_id=None):
+    """
+    Save a call record, merging it into the caller's earlier record when the
+    same applicant applied from the same phone number within DEDUP_WINDOW_S
+    (see dedup.same_applicant and dedup.merge_record).
+
+    call_id identifies the call (its resume token); saving the same call
+    twice updates the row it saved the first time.
+    """
     data = {
         "name": name,
-        "number": number,
+        "number": normalize_phone(number) or number,
         "address": address,
         "pay": pay,
         "contact_status": contact_status,
         "transcription": transcription,
-        "age": age
+        "age": age,
+        "call_id": call_id,
     }
-    response = supabase.table("calls").insert(data).execute()
+    phone = normalize_phone(number)
+    recent = _recent_calls(phone, time.time() - DEDUP_WINDOW_S) if phone else []
+    # Several people can share a phone; merge only into this caller's own row
+    for existing in recent:
+        if same_applicant(existing, data):
+            return _merge_into(existing, data)
+    return _insert_call(data)
+
+
+@supabase_call()
+def _recent_calls(phone: str, since: float):
+    """Rows with this normalised phone number saved after since, newest first."""
+    cutoff = datetime.fromtimestamp(since, timezone.utc).isoformat()
+    response = (
+        get_client().table("calls").select("*")
+        .eq("number", phone).gte("created_at", cutoff).order("created_at", desc=True).execute()
+    )
+    return response.data if response.data else []
+
+
+@supabase_call()
+def _insert_call(data: dict):
+    # Upserting on call_id makes a retry of a write that did reach Supabase harmless
+    if data.get("call_id"):
+        query = get_client().table("calls").upsert(data, on_conflict="call_id")
+    else:
+        query = get_client().table("calls").insert(data)
+    response = query.execute()
+    for row in response.data or []:
+        APPLICANT_INDEX.add(row)
     return response.data
 
 
+def _merge_into(existing: dict, data: dict):
+    changes = merge_record(existing, data)
+    if not changes:
+        return [existing]
+    response = _update_calls(existing["id"], changes)
+    for row in response.data or []:
+        APPLICANT_INDEX.add(row)
+    return response.data
+
+
+@supabase_call()
 def checklogin(email, password):
     """Verify employer login credentials."""
-    response = supabase.table("employers").select("*").eq("email", email).execute()
+    response = get_client().table("employers").select("*").eq("email", email).execute()
     if response.data:
         user = response.data[0]
         if bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
@@ -42,6 +158,7 @@ def checklogin(email, password):
     return None
 
 
+@supabase_call(retry_on=_not_sent)
 def add_employer_login(email, password):
     """Create employer login account with hashed password."""
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -51,10 +168,11 @@ def add_employer_login(email, password):
         "password": hashed_password,
         "emp_id": emp_id
     }
-    response = supabase.table("employers").insert(data).execute()
+    response = get_client().table("employers").insert(data).execute()
     return (response.data, emp_id)
 
 
+@supabase_call(retry_on=_not_sent)
 def add_employer_profile(emp_id, name, location, expected_wage):
     """Create employer profile."""
     data = {
@@ -63,16 +181,17 @@ def add_employer_profile(emp_id, name, location, expected_wage):
         "expected_wage": expected_wage,
         "name": name,
     }
-    response = supabase.table("employer_profiles").insert(data).execute()
+    response = get_client().table("employer_profiles").insert(data).execute()
     return response.data
 
 
+@supabase_call()
 def get_employer_by_id(emp_id):
     """Fetch employer profile and email by ID."""
-    profile_res = supabase.table("employer_profiles").select("*").eq("emp_id", emp_id).execute()
+    profile_res = get_client().table("employer_profiles").select("*").eq("emp_id", emp_id).execute()
     profile = profile_res.data[0] if profile_res.data else None
 
-    employer_res = supabase.table("employers").select("email").eq("emp_id", emp_id).execute()
+    employer_res = get_client().table("employers").select("email").eq("emp_id", emp_id).execute()
     employer = employer_res.data[0] if employer_res.data else None
 
     if not profile and not employer:
@@ -84,20 +203,54 @@ def get_employer_by_id(emp_id):
     }
 
 
+@supabase_call()
+def get_employer_profile(emp_id):
+    """Fetch an employer's profile row (location, expected_wage, ...), or None."""
+    response = get_client().table("employer_profiles").select("*").eq("emp_id", emp_id).execute()
+    return response.data[0] if response.data else None
+
+
+@supabase_call()
 def get_masons():
     """Fetch all collected mason records."""
-    response = supabase.table("calls").select("*").execute()
+    response = get_client().table("calls").select("*").execute()
+    return response.data if response.data else []
+
+
+@supabase_call()
+def get_masons_since(last_id: int, limit: int):
+    """Fields the applicant index needs, for records with id > last_id in id order."""
+    response = (
+        get_client().table("calls").select("id,address,pay,age")
+        .gt("id", last_id).order("id").limit(limit).execute()
+    )
     return response.data if response.data else []
 
 
+@supabase_call()
+def get_masons_by_ids(ids: list):
+    """Fetch mason records by id, in the order given."""
+    if not ids:
+        return []
+    response = get_client().table("calls").select("*").in_("id", ids).execute()
+    rows = {row["id"]: row for row in response.data or []}
+    return [rows[i] for i in ids if i in rows]
+
+
+@supabase_call()
+def _update_calls(mason_id: int, values: dict):
+    # Setting a column to a value is idempotent, so any transport error is retried
+    return get_client().table("calls").update(values).eq("id", mason_id).execute()
+
+
 def update_contact_status(mason_id: int, new_status: str):
     """Update the contact status for a mason."""
     try:
-        response = supabase.table("calls").update({"contact_status": new_status}).eq("id", mason_id).execute()
+        response = _update_calls(mason_id, {"contact_status": new_status})
 
         if response.data:
             return {"status": "success", "updated": True, "row": response.data[0]}
         else:
             return {"status": "error", "updated": False, "message": "No rows updated (id not found)"}
-    except Exception as e:
+    except DatabaseError as e:
         return {"status": "error", "updated": False, "message": str(e)}
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Recognising repeat applications from the same caller.
+
+Callers who call again (after a dropped line, or to correct an answer)
+should update their existing calls row instead of adding another one. Two
+records are the same applicant when their normalised phone numbers match,
+the earlier one was saved within DEDUP_WINDOW_S and their names agree (see
+same_applicant): family members often share one phone, and each of them
+keeps their own row.
+
+Candidates are found with one query on the calls table's (number,
+created_at) index, so rows saved a moment ago by another worker count too.
+A save that is repeated for the same call (a retried request, or a dropped
+call resumed with its token) is absorbed by the unique call_id column.
+"""
+
+import os
+import re
+import string
+
+DEDUP_WINDOW_S = float(os.getenv("DEDUP_WINDOW_S", str(7 * 24 * 3600)))
+
+# contact_status is set by employers on the dashboard, call_id names the call
+# that created the row; a new call changes neither
+KEEP_EXISTING = {"contact_status", "call_id"}
+
+
+def normalize_phone(number):
+    """Indian mobile number as its 10 digits (+91 and trunk 0 dropped), or None."""
+    digits = re.sub(r"\D", "", str(number or ""))
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) >= 10 else None
+
+
+def name_words(name) -> set:
+    """Casefolded words of a name, punctuation stripped."""
+    words = (word.strip(string.punctuation) for word in str(name or "").casefold().split())
+    return {word for word in words if word}
+
+
+def same_applicant(existing: dict, new: dict) -> bool:
+    """
+    True if two records with the same phone number are one person.
+
+    Names agree when the words of one contain the other's ("Ravi" and "Ravi
+    Kumar"); a record without a name agrees with any.
+    """
+    old, new = name_words(existing.get("name")), name_words(new.get("name"))
+    return not old or not new or old <= new or new <= old
+
+
+def merge_record(existing: dict, new: dict) -> dict:
+    """
+    Columns of the existing row to change for a repeat application.
+
+    Newer non-empty values win; empty answers never blank out earlier ones,
+    and KEEP_EXISTING columns are left as they are.
+    """
+    return {
+        field: value for field, value in new.items()
+        if field not in KEEP_EXISTING and field != "id"
+        and value not in (None, "") and value != existing.get(field)
+    }
+
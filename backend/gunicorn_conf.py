@@ -0,0 +1,26 @@
+"""Gunicorn settings for running the API with several worker processes.
+
+    gunicorn -c gunicorn_conf.py app:app
+
+Any worker may receive any turn of a call, so sessions must live in a shared
+store. With more than one worker this defaults SESSION_BACKEND to sqlite (one
+machine); set SESSION_BACKEND=supabase and AUDIO_BACKEND=supabase (or a
+shared AUDIO_DIR) when running on several machines behind a load balancer.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# ASR and TTS calls can take several seconds; don't kill workers mid-turn
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+if workers > 1:
+    backend = os.environ.setdefault("SESSION_BACKEND", "sqlite")
+    if backend == "memory":
+        raise RuntimeError("SESSION_BACKEND=memory cannot be shared by several workers")
@@ -1,219 +1,510 @@
-from gtts import gTTS
-import tempfile
+import logging
 import os
-import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from language_config import (
-    QUESTIONS, CONFIRMATIONS, ERROR_MESSAGES,
-    CONFIRMATION_WORDS, LANGUAGE_CODES, TTS_LANGUAGE_CODES
+    QUESTIONS, CONFIRMATIONS, BATCH_CONFIRMATIONS, FIELD_LABELS, ERROR_MESSAGES,
+    CONFIRMATION_WORDS, CONFIDENCE_THRESHOLDS, LANGUAGE_CODES, TTS_LANGUAGE_CODES,
+    SERVICE_ERROR_MESSAGES, RESUME_MESSAGES
 )
+from dedup import normalize_phone
+from number_parser import parse_number, parse_digits
+from slot_extractor import extract_slots, valid_age
+from metrics import span, record_cache_lookup
+from resilience import BREAKERS, SynthesisError, ServiceError, check_deadline, retrying
+from session_store import get_store
+from audio_store import get_audio_store
 
-# In-memory session store
-SESSIONS = {}
+logger = logging.getLogger(__name__)
+
+# Session state between turns; shared by all workers unless SESSION_BACKEND=memory
+SESSION_STORE = get_store()
+PURGE_INTERVAL_S = 60
+_last_purge = 0.0
+
+# Answers confirmed so far, by resume token and by caller phone number, so a
+# caller whose call drops can pick up where they left off. Kept apart from
+# SESSION_STORE so they don't count as calls in progress.
+RESUME_TTL_S = float(os.getenv("RESUME_TTL_S", str(24 * 3600)))
+RESUME_STORE = get_store("ivr_resume", RESUME_TTL_S)
+
+# Synthesized prompts, served by /audio or the storage bucket
+AUDIO_STORE = get_audio_store()
+GTTS_TIMEOUT_S = float(os.getenv("GTTS_TIMEOUT_S", "5"))
+GTTS_ATTEMPTS = int(os.getenv("GTTS_ATTEMPTS", "2"))
 
 # Fields to collect from user
 FIELDS = ["name", "age", "number", "address", "pay"]
 
+# Synthesized prompt files by (language, text). Questions, confirmations of
+# common answers and error prompts repeat across calls, so most TTS is reusable.
+PROMPT_CACHE = OrderedDict()
+PROMPT_CACHE_SIZE = 512
+_prompt_cache_lock = threading.Lock()  # Prompts are synthesized on the threadpool
+
+
+def start_session(session_id: str, language: str = "en", caller: str = None) -> dict:
+    """
+    Initialize a new IVR session with language preference.
+
+    caller is the phone number the call comes from, when known; the
+    session's answers can then be resumed from it as well as its token.
+    """
+    global _last_purge
+    if time.time() - _last_purge > PURGE_INTERVAL_S:
+        # Drop sessions of calls that hung up mid-way
+        _last_purge = time.time()
+        SESSION_STORE.purge_expired()
+        RESUME_STORE.purge_expired()
+
+    session = {f: None for f in FIELDS}
+    session["current_field"] = FIELDS[0]
+    session["awaiting_confirmation"] = False
+    session["pending_fields"] = []  # Fields filled this turn, awaiting confirmation
+    session["language"] = language  # Store language preference
+    session["awaiting_resume"] = False  # Asked whether to continue an earlier call
+    session["resume_token"] = secrets.token_urlsafe(12)
+    session["caller"] = normalize_phone(caller)
+    SESSION_STORE.save(session_id, session)
+    return session
 
-def start_session(session_id: str, language: str = "en"):
-    """Initialize a new IVR session with language preference."""
-    SESSIONS[session_id] = {f: None for f in FIELDS}
-    SESSIONS[session_id]["current_field"] = FIELDS[0]
-    SESSIONS[session_id]["awaiting_confirmation"] = False
-    SESSIONS[session_id]["language"] = language  # Store language preference
+
+def get_session(session_id: str):
+    """The session's current state, or None if there is no call in progress."""
+    return SESSION_STORE.get(session_id)
 
 
 def reset_session(session_id: str):
     """Reset and clear a session."""
-    if session_id in SESSIONS:
-        del SESSIONS[session_id]
+    SESSION_STORE.delete(session_id)
+
 
+def get_initial_question(session_id: str, language: str = "en", synthesize: bool = True,
+                         caller: str = None, resume_token: str = None):
+    """
+    Get the welcome message and first question without requiring audio input.
 
-def get_initial_question(session_id: str, language: str = "en"):
-    """Get the welcome message and first question without requiring audio input."""
+    With synthesize=False no MP3 is generated (audio_file is None), for
+    callers such as phone streams that produce their own audio. If an earlier
+    call from the same resume_token or caller phone dropped part-way, the
+    caller is offered to continue from it instead.
+    """
     # Initialize session with language
-    start_session(session_id, language)
-    
-    # Get first question in selected language
-    assistant_text = QUESTIONS[language]["name"]
+    session = start_session(session_id, language, caller)
+
+    if resume_session(session_id, session, resume_token):
+        assistant_text = resume_offer_text(session)
+    else:
+        # Get first question in selected language
+        assistant_text = QUESTIONS[language]["name"]
     
     # Generate TTS in selected language
-    audio_file = synthesize_speech(assistant_text, language)
+    audio_file = synthesize_speech(assistant_text, language) if synthesize else None
     
     return {
         "assistant_text": assistant_text,
         "finished": False,
-        "fields": {f: None for f in FIELDS},
-        "audio_file": audio_file
+        "fields": {f: session.get(f) for f in FIELDS},
+        "audio_file": audio_file,
+        "resume_token": session["resume_token"]
     }
 
 
+def _resume_keys(session: dict) -> list:
+    keys = [f"token:{session['resume_token']}"]
+    if session.get("caller"):
+        keys.append(f"phone:{session['caller']}")
+    return keys
+
+
+def checkpoint(session: dict):
+    """Save the answers confirmed so far for resuming after a dropped call."""
+    confirmed = {
+        f: session[f] for f in FIELDS
+        if session.get(f) is not None and f not in session["pending_fields"]
+    }
+    if not confirmed:
+        return
+    saved = {"fields": confirmed, "resume_token": session["resume_token"], "caller": session.get("caller")}
+    for key in _resume_keys(session):
+        RESUME_STORE.save(key, saved)
+
+
+def clear_checkpoint(session: dict):
+    """Forget the resumable answers once the call starts over."""
+    for key in _resume_keys(session):
+        RESUME_STORE.delete(key)
+
+
+def application_saved(resume_token: str):
+    """
+    Forget a finished call's checkpoint once its application is in the
+    database. Until then it stays, so a caller whose application could not
+    be saved can call back and resume.
+    """
+    saved = RESUME_STORE.get(f"token:{resume_token}") if resume_token else None
+    if saved:
+        clear_checkpoint(saved)
+
+
+def resume_session(session_id: str, session: dict, resume_token: str = None) -> bool:
+    """
+    Load the confirmed answers of a dropped call into a new session, by
+    resume token or else by the caller's phone number. The caller is then
+    asked whether to continue; returns False if there is nothing to resume.
+    """
+    saved = None
+    if resume_token:
+        saved = RESUME_STORE.get(f"token:{resume_token}")
+    if saved is None and session.get("caller"):
+        saved = RESUME_STORE.get(f"phone:{session['caller']}")
+    if not saved or next_missing_field(dict(session, **saved["fields"])) is None:
+        return False
+
+    session.update(saved["fields"])
+    session["resume_token"] = saved["resume_token"]  # Same token if this call drops too
+    session["current_field"] = next_missing_field(session)
+    session["awaiting_resume"] = True
+    SESSION_STORE.save(session_id, session)
+    logger.info("Offering to resume earlier call", extra={
+        "session_id": session_id, "resumed_fields": list(saved["fields"]),
+    })
+    return True
+
+
+def resume_offer_text(session: dict) -> str:
+    """Ask whether to continue from the first unanswered question."""
+    language = session.get("language", "en")
+    field = FIELD_LABELS[language][session["current_field"]]
+    return RESUME_MESSAGES[language]["offer"].format(field=field)
+
+
+def cached_prompt(text: str, language: str = "en"):
+    """Path of an already synthesized MP3 of text, or None."""
+    key = (language, text)
+    with _prompt_cache_lock:
+        cached = PROMPT_CACHE.get(key)
+        if cached:
+            PROMPT_CACHE.move_to_end(key)
+    if cached and os.path.exists(cached):
+        record_cache_lookup("tts_prompt", hit=True)
+        return cached
+    return None
+
+
 def synthesize_speech(text: str, language: str = "en") -> str:
-    """Generate TTS audio file using gTTS and return file path."""
+    """Return the path of an MP3 of text, reusing an earlier one when the prompt repeats."""
+    cached = cached_prompt(text, language)
+    if cached:
+        return cached
+    record_cache_lookup("tts_prompt", hit=False)
+    key = (language, text)
+
+    with span("tts"):
+        audio_path = render_speech(text, language)
+
+    with _prompt_cache_lock:
+        PROMPT_CACHE[key] = audio_path
+        if len(PROMPT_CACHE) > PROMPT_CACHE_SIZE:
+            PROMPT_CACHE.popitem(last=False)
+    return audio_path
+
+
+def render_speech(text: str, language: str = "en") -> str:
+    """
+    Generate TTS audio file using gTTS and return file path.
+
+    Raises:
+        SynthesisError: If gTTS failed, timed out or its breaker is open
+    """
+    # gTTS pulls in requests and its dependencies; load it on first use
+    from gtts import gTTS, gTTSError
+
     tts_lang = TTS_LANGUAGE_CODES.get(language, "en")
-    tts = gTTS(text=text, lang=tts_lang, slow=False)
-    tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    tts.save(tmp_file.name)
-    return tmp_file.name
+    audio_path = AUDIO_STORE.new_path(".mp3")
+    try:
+        with BREAKERS["gtts"].guard():
+            for attempt in retrying(lambda e: isinstance(e, gTTSError), GTTS_ATTEMPTS):
+                with attempt:
+                    timeout = min(check_deadline("gtts"), GTTS_TIMEOUT_S)
+                    gTTS(text=text, lang=tts_lang, slow=False, timeout=timeout).save(audio_path)
+    except Exception as e:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+        if isinstance(e, ServiceError):
+            raise SynthesisError("gtts", str(e)) from e
+        raise SynthesisError("gtts", f"TTS generation failed: {e}") from e
+    return audio_path
 
 
-def process_turn(session_id: str, user_text: str):
-    """Process a user turn with natural conversation flow."""
-    if session_id not in SESSIONS:
-        start_session(session_id)
+def repeat_turn(session_id: str, session: dict = None, synthesize: bool = True):
+    """
+    Ask the current question (or confirmation) again, after the caller's
+    audio could not be transcribed. The session is left as it was, so a
+    failed transcription never becomes an answer.
+    """
+    if session is None:
+        session = get_session(session_id) or start_session(session_id)
+    language = session.get("language", "en")
 
-    session = SESSIONS[session_id]
-    current_field = session["current_field"]
+    if session.get("awaiting_resume"):
+        question = resume_offer_text(session)
+    elif session["awaiting_confirmation"]:
+        question = confirmation_text(session["pending_fields"], session, language)
+    else:
+        question = QUESTIONS[language][session["current_field"]]
+    assistant_text = SERVICE_ERROR_MESSAGES[language]["not_heard"].format(question=question)
+
+    audio_file = synthesize_speech(assistant_text, language) if synthesize else None
+
+    return {
+        "assistant_text": assistant_text,
+        "finished": False,
+        "fields": {f: session.get(f) for f in FIELDS},
+        "audio_file": audio_file,
+        "resume_token": session.get("resume_token")
+    }
+
+
+def parse_field(field: str, text: str, language: str = "en"):
+    """Validate a direct answer to a field's question; returns None if invalid."""
+    if field == "number":
+        digits = parse_digits(text, language)
+        return digits if len(digits) >= 10 else None
+    if field == "age":
+        age = parse_number(text, language)
+        return str(age) if valid_age(age) else None
+    if field == "pay":
+        pay = parse_number(text, language)
+        return str(pay) if pay else None
+    # For name and address, use as-is
+    return text.strip() or None
+
+
+def format_field(field: str, value: str) -> str:
+    """Format a field value for reading back to the caller."""
+    if field == "number":
+        return f"{value[:3]} {value[3:6]} {value[6:10]}"
+    return value
+
+
+def confirmation_text(fields: list, session: dict, language: str = "en") -> str:
+    """Build one confirmation prompt covering every field filled this turn."""
+    if len(fields) == 1:
+        field = fields[0]
+        return CONFIRMATIONS[language][field].format(value=format_field(field, session[field]))
+    summary = ", ".join(
+        f"{FIELD_LABELS[language][f]} {format_field(f, session[f])}" for f in fields
+    )
+    return BATCH_CONFIRMATIONS[language].format(summary=summary)
+
+
+def next_missing_field(session: dict):
+    """Return the first field that has not been answered yet, or None."""
+    for field in FIELDS:
+        if session.get(field) is None:
+            return field
+    return None
+
+
+def advance_session(session_id: str, session: dict, language: str = "en"):
+    """Accept the pending fields and ask the next unanswered question, or finish."""
+    session["awaiting_confirmation"] = False
+    session["pending_fields"] = []
+    next_field = next_missing_field(session)
+
+    if next_field is not None:
+        session["current_field"] = next_field
+        # Smooth transition to next question
+        next_question = QUESTIONS[language][next_field]
+        
+        # Language-specific "Excellent!" prefix
+        excellent_prefix = {
+            "en": "Excellent!",
+            "hi": "बहुत बढ़िया!",
+            "ta": "அருமை!"
+        }
+        assistant_text = f"{excellent_prefix[language]} {next_question}"
+        finished = False
+        checkpoint(session)
+    else:
+        # All fields collected - warm completion message
+        name = session.get("name", "there")
+        
+        # Language-specific completion messages
+        completion_messages = {
+            "en": (
+                f"Perfect, {name}! We've got all your information. "
+                f"Thank you for applying with MASON! "
+                f"We'll review your application and get back to you soon at {session.get('number')}. "
+                f"Have a great day!"
+            ),
+            "hi": (
+                f"बिल्कुल सही, {name}! हमें आपकी सभी जानकारी मिल गई है। "
+                f"MASON के साथ आवेदन करने के लिए धन्यवाद! "
+                f"हम आपके आवेदन की समीक्षा करेंगे और जल्द ही {session.get('number')} पर संपर्क करेंगे। "
+                f"आपका दिन शुभ हो!"
+            ),
+            "ta": (
+                f"சரியானது, {name}! உங்கள் அனைத்து தகவல்களையும் பெற்றுவிட்டோம். "
+                f"MASON உடன் விண்ணப்பித்ததற்கு நன்றி! "
+                f"உங்கள் விண்ணப்பத்தை மதிப்பாய்வு செய்து விரைவில் {session.get('number')} இல் தொடர்பு கொள்வோம். "
+                f"நல்ல நாள்!"
+            )
+        }
+        assistant_text = completion_messages[language]
+        finished = True
+        reset_session(session_id)
+
+    return assistant_text, finished
+
+
+def said_no(user_text: str, language: str = "en") -> bool:
+    """True if the caller said no/incorrect; anything else counts as yes."""
+    # Be very flexible: any language-specific no word anywhere in the text
+    cleaned_text = user_text.strip().lower()
+    return any(word in cleaned_text for word in CONFIRMATION_WORDS[language]["no"])
+
+
+def is_confident(field: str, confidence, language: str = "en") -> bool:
+    """True when the recognizer is sure enough to skip confirming a direct answer to field."""
+    if confidence is None:
+        return False
+    thresholds = CONFIDENCE_THRESHOLDS.get(language, CONFIDENCE_THRESHOLDS["en"])
+    return confidence >= thresholds[field]
+
+
+def process_turn(session_id: str, user_text: str, confidence: float = None,
+                 synthesize: bool = True, session: dict = None):
+    """
+    Process a user turn with natural conversation flow.
+
+    confidence is the recognizer's score for user_text; when it clears the
+    field's threshold, a direct answer to the question asked is accepted
+    without a confirmation turn. Other fields mentioned are always confirmed.
+    synthesize=False skips the MP3 prompt, as in get_initial_question.
+    session is the state from get_session(), when the caller already has it.
+    """
+    if session is None:
+        session = get_session(session_id) or start_session(session_id)
     language = session.get("language", "en")  # Get language from session
 
-    print(f"[IVR] User said: '{user_text}' (Language: {language})")
-    
+    with span("state_machine"):
+        assistant_text, finished = step_session(session_id, session, user_text, confidence)
+        if not finished:
+            SESSION_STORE.save(session_id, session)
+
+    # Generate TTS output in selected language
+    audio_file = synthesize_speech(assistant_text, language) if synthesize else None
+
+    return {
+        "assistant_text": assistant_text,
+        "finished": finished,
+        "fields": {f: session.get(f) for f in FIELDS},
+        "audio_file": audio_file,
+        # Still set when finished: the checkpoint stays until application_saved()
+        "resume_token": session.get("resume_token")
+    }
+
+
+def step_session(session_id: str, session: dict, user_text: str, confidence: float = None):
+    """Advance the conversation by one caller utterance; returns (assistant_text, finished)."""
+    current_field = session["current_field"]
+    language = session.get("language", "en")
+
+    logger.debug("Caller turn", extra={
+        "session_id": session_id, "language": language, "field": current_field, "transcript": user_text,
+    })
+
+    # CASE 0: Asked whether to continue a dropped call's answers
+    if session.get("awaiting_resume"):
+        if len(user_text.strip()) < 2:
+            assistant_text = resume_offer_text(session)
+        else:
+            session["awaiting_resume"] = False
+            if said_no(user_text, language):
+                clear_checkpoint(session)
+                for field in FIELDS:
+                    session[field] = None
+                session["current_field"] = FIELDS[0]
+                message = "restart"
+            else:
+                message = "continue"
+            question = QUESTIONS[language][session["current_field"]]
+            assistant_text = RESUME_MESSAGES[language][message].format(question=question)
+        finished = False
+
     # CASE 1: Waiting for CORRECT/INCORRECT confirmation
-    if session["awaiting_confirmation"]:
+    elif session["awaiting_confirmation"]:
         # Clean and normalize the user text
         cleaned_text = user_text.strip().lower()
-        print(f"[IVR] Checking confirmation. Cleaned text: '{cleaned_text}'")
-        
+
         # Handle empty or very short transcriptions
         if len(cleaned_text) < 2:
-            print(f"[IVR] Transcription too short or empty. Asking to repeat.")
+            logger.debug("Empty confirmation, asking to repeat", extra={"session_id": session_id})
             assistant_text = ERROR_MESSAGES[language]["empty"]
             finished = False
         else:
-            # Check for INCORRECT/NO - be very flexible
-            is_no = False
-            
-            # Get language-specific no words
-            no_words = CONFIRMATION_WORDS[language]["no"]
-            
-            # Check if any no word is in the cleaned text
-            for word in no_words:
-                if word in cleaned_text:
-                    is_no = True
-                    break
-                
-            print(f"[IVR] Detection result - is_no: {is_no}")
-            
             # DEFAULT TO YES/CORRECT unless user clearly said NO/INCORRECT
-            if not is_no:
-                # User confirmed (or didn't clearly say no) - move to next field
-                print(f"[IVR] User confirmed! Moving to next field.")
-                session["awaiting_confirmation"] = False
-                next_index = FIELDS.index(current_field) + 1
-
-                if next_index < len(FIELDS):
-                    session["current_field"] = FIELDS[next_index]
-                    # Smooth transition to next question
-                    next_question = QUESTIONS[language][session['current_field']]
-                    
-                    # Language-specific "Excellent!" prefix
-                    excellent_prefix = {
-                        "en": "Excellent!",
-                        "hi": "बहुत बढ़िया!",
-                        "ta": "அருமை!"
-                    }
-                    assistant_text = f"{excellent_prefix[language]} {next_question}"
-                    finished = False
-                else:
-                    # All fields collected - warm completion message
-                    name = session.get("name", "there")
-                    
-                    # Language-specific completion messages
-                    completion_messages = {
-                        "en": (
-                            f"Perfect, {name}! We've got all your information. "
-                            f"Thank you for applying with MASON! "
-                            f"We'll review your application and get back to you soon at {session.get('number')}. "
-                            f"Have a great day!"
-                        ),
-                        "hi": (
-                            f"बिल्कुल सही, {name}! हमें आपकी सभी जानकारी मिल गई है। "
-                            f"MASON के साथ आवेदन करने के लिए धन्यवाद! "
-                            f"हम आपके आवेदन की समीक्षा करेंगे और जल्द ही {session.get('number')} पर संपर्क करेंगे। "
-                            f"आपका दिन शुभ हो!"
-                        ),
-                        "ta": (
-                            f"சரியானது, {name}! உங்கள் அனைத்து தகவல்களையும் பெற்றுவிட்டோம். "
-                            f"MASON உடன் விண்ணப்பித்ததற்கு நன்றி! "
-                            f"உங்கள் விண்ணப்பத்தை மதிப்பாய்வு செய்து விரைவில் {session.get('number')} இல் தொடர்பு கொள்வோம். "
-                            f"நல்ல நாள்!"
-                        )
-                    }
-                    assistant_text = completion_messages[language]
-                    finished = True
-                    reset_session(session_id)
+            if not said_no(cleaned_text, language):
+                # User confirmed (or didn't clearly say no) - move to next unanswered field
+                assistant_text, finished = advance_session(session_id, session, language)
             else:
-                # User clearly said no - friendly retry
-                print(f"[IVR] User said no. Asking again.")
+                # User clearly said no - discard everything heard this turn and retry
+                logger.debug("Caller rejected confirmation", extra={
+                    "session_id": session_id, "pending_fields": session["pending_fields"],
+                })
+                for field in session["pending_fields"]:
+                    session[field] = None
+                session["pending_fields"] = []
                 question = QUESTIONS[language][current_field]
                 assistant_text = ERROR_MESSAGES[language]["retry"].format(question=question)
                 session["awaiting_confirmation"] = False
                 finished = False
 
-    # CASE 2: Normal input - save value and ask for confirmation
+    # CASE 2: Normal input - fill every field the caller mentioned, then confirm them together
     else:
-        # Special validation for phone number
-        if current_field == "number":
-            digits = re.sub(r"\D", "", user_text)
-            if len(digits) < 10:
-                assistant_text = ERROR_MESSAGES[language]["number"]
-                audio_file = synthesize_speech(assistant_text, language)
-                return {
-                    "assistant_text": assistant_text,
-                    "finished": False,
-                    "fields": {f: session.get(f) for f in FIELDS},
-                    "audio_file": audio_file
-                }
-            # Format phone number nicely
-            formatted_number = f"{digits[:3]} {digits[3:6]} {digits[6:10]}"
-            session["number"] = digits
-            confirmation_value = formatted_number
-
-        # Special validation for age
-        elif current_field == "age":
-            digits = re.sub(r"\D", "", user_text)
-            if not digits or not (18 <= int(digits) < 120):
-                assistant_text = ERROR_MESSAGES[language]["age"]
-                audio_file = synthesize_speech(assistant_text, language)
-                return {
-                    "assistant_text": assistant_text,
-                    "finished": False,
-                    "fields": {f: session.get(f) for f in FIELDS},
-                    "audio_file": audio_file
-                }
-            session["age"] = digits
-            confirmation_value = digits
-
-        # Special validation for pay
-        elif current_field == "pay":
-            digits = re.sub(r"\D", "", user_text)
-            if not digits:
-                assistant_text = ERROR_MESSAGES[language]["pay"]
-                audio_file = synthesize_speech(assistant_text, language)
-                return {
-                    "assistant_text": assistant_text,
-                    "finished": False,
-                    "fields": {f: session.get(f) for f in FIELDS},
-                    "audio_file": audio_file
-                }
-            session["pay"] = digits
-            confirmation_value = digits
+        slots, residual = extract_slots(user_text, language, expected_field=current_field)
+        filled = {}
 
-        else:
-            # For name and address, use as-is
-            session[current_field] = user_text.strip()
-            confirmation_value = user_text.strip()
+        if current_field in slots:
+            filled[current_field] = slots[current_field]
+        elif residual or not slots:
+            # Direct answer to the question that was asked
+            value = parse_field(current_field, residual or user_text, language)
+            if value is not None:
+                filled[current_field] = value
 
-        # Ask for confirmation with contextual message in selected language
-        assistant_text = CONFIRMATIONS[language][current_field].format(value=confirmation_value)
-        session["awaiting_confirmation"] = True
-        finished = False
+        # Other fields volunteered in the same utterance, unless already answered
+        for field, value in slots.items():
+            if field != current_field and session.get(field) is None:
+                filled[field] = value
 
-    # Generate TTS output in selected language
-    audio_file = synthesize_speech(assistant_text, language)
+        if not filled:
+            # Cues only matched fields already answered - take the whole text as the answer
+            value = parse_field(current_field, user_text, language)
+            if value is None:
+                return ERROR_MESSAGES[language][current_field], False
+            filled[current_field] = value
 
-    return {
-        "assistant_text": assistant_text,
-        "finished": finished,
-        "fields": {f: session.get(f) for f in FIELDS},
-        "audio_file": audio_file
-    }
+        logger.debug("Filled fields", extra={"session_id": session_id, "filled": list(filled)})
+        session.update(filled)
+        session["pending_fields"] = [f for f in FIELDS if f in filled]
+
+        # The recognizer's score says nothing about which field a value belongs
+        # to, so only a lone answer to the question asked can skip confirmation
+        if session["pending_fields"] == [current_field] and is_confident(current_field, confidence, language):
+            # Clean, valid answer - skip the confirmation turn
+            logger.debug("Confident answer, skipping confirmation", extra={
+                "session_id": session_id, "confidence": confidence,
+            })
+            assistant_text, finished = advance_session(session_id, session, language)
+        else:
+            # Ask for confirmation with contextual message in selected language
+            assistant_text = confirmation_text(session["pending_fields"], session, language)
+            session["awaiting_confirmation"] = True
+            finished = False
+
+    return assistant_text, finished
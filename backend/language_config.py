@@ -50,8 +50,24 @@ CONFIRMATIONS = {
     }
 }
 
+# Used when one answer filled several fields, e.g. "I'm Ravi, 32, from Chennai"
+BATCH_CONFIRMATIONS = {
+    "en": "Let me confirm - {summary}. Is that all correct? Please say 'correct' or 'incorrect'.",
+    "hi": "पुष्टि करता हूं - {summary}। क्या यह सब सही है? कृपया 'सही' या 'गलत' कहें।",
+    "ta": "உறுதிப்படுத்துகிறேன் - {summary}. இவை அனைத்தும் சரியா? 'சரி' அல்லது 'தவறு' என்று சொல்லுங்கள்."
+}
+
+# Field names as read out in batched confirmations
+FIELD_LABELS = {
+    "en": {"name": "name", "age": "age", "number": "phone number", "address": "address", "pay": "expected monthly pay"},
+    "hi": {"name": "नाम", "age": "उम्र", "number": "फोन नंबर", "address": "पता", "pay": "अपेक्षित मासिक वेतन"},
+    "ta": {"name": "பெயர்", "age": "வயது", "number": "தொலைபேசி எண்", "address": "முகவரி", "pay": "எதிர்பார்க்கும் மாத சம்பளம்"}
+}
+
 ERROR_MESSAGES = {
     "en": {
+        "name": "Sorry, I didn't catch your name. Could you please tell me your name again?",
+        "address": "Sorry, I didn't catch where you live. Could you please tell me your area and city again?",
         "number": "I didn't quite catch that. Could you please say your 10-digit phone number again? You can say it digit by digit if that helps.",
         "age": "Sorry, I couldn't understand your age. Could you please tell me how old you are? Just say the number.",
         "pay": "I couldn't catch the salary amount. Could you please tell me your expected monthly pay again?",
@@ -59,6 +75,8 @@ ERROR_MESSAGES = {
         "retry": "No problem! Let me ask again. {question}"
     },
     "hi": {
+        "name": "क्षमा करें, मुझे आपका नाम समझ नहीं आया। कृपया अपना नाम फिर से बताएं?",
+        "address": "क्षमा करें, मुझे आपका पता समझ नहीं आया। कृपया अपना इलाका और शहर फिर से बताएं?",
         "number": "मुझे वह समझ नहीं आया। क्या आप कृपया अपना 10 अंकों का फोन नंबर फिर से बता सकते हैं? आप इसे अंक दर अंक बोल सकते हैं।",
         "age": "क्षमा करें, मुझे आपकी उम्र समझ नहीं आई। कृपया बताएं कि आप कितने साल के हैं? बस संख्या बोलें।",
         "pay": "मुझे वेतन राशि समझ नहीं आई। कृपया अपनी अपेक्षित मासिक वेतन फिर से बताएं?",
@@ -66,6 +84,8 @@ ERROR_MESSAGES = {
         "retry": "कोई बात नहीं! मैं फिर से पूछता हूं। {question}"
     },
     "ta": {
+        "name": "மன்னிக்கவும், உங்கள் பெயர் புரியவில்லை. உங்கள் பெயரை மீண்டும் சொல்ல முடியுமா?",
+        "address": "மன்னிக்கவும், நீங்கள் எங்கே வசிக்கிறீர்கள் என்று புரியவில்லை. உங்கள் பகுதி மற்றும் ஊரை மீண்டும் சொல்ல முடியுமா?",
         "number": "எனக்கு அது புரியவில்லை. உங்கள் 10 இலக்க தொலைபேசி எண்ணை மீண்டும் சொல்ல முடியுமா? நீங்கள் அதை இலக்கம் இலக்கமாக சொல்லலாம்.",
         "age": "மன்னிக்கவும், உங்கள் வயது புரியவில்லை. நீங்கள் எத்தனை வயது என்று சொல்ல முடியுமா? எண்ணை மட்டும் சொல்லுங்கள்.",
         "pay": "சம்பள தொகை புரியவில்லை. உங்கள் எதிர்பார்க்கும் மாதாந்திர சம்பளத்தை மீண்டும் சொல்ல முடியுமா?",
@@ -74,6 +94,63 @@ ERROR_MESSAGES = {
     }
 }
 
+# Said when the service is over capacity (see admission.py)
+CAPACITY_MESSAGES = {
+    "en": {
+        "call_back": "Sorry, all our lines are busy right now. Please call back in a few minutes.",
+        "busy_retry": "Sorry, we're a little busy. Please say that again in a moment."
+    },
+    "hi": {
+        "call_back": "क्षमा करें, अभी हमारी सभी लाइनें व्यस्त हैं। कृपया कुछ मिनट बाद फिर से कॉल करें।",
+        "busy_retry": "क्षमा करें, अभी थोड़ी व्यस्तता है। कृपया कुछ पल बाद फिर से बोलें।"
+    },
+    "ta": {
+        "call_back": "மன்னிக்கவும், எங்கள் அனைத்து இணைப்புகளும் இப்போது பிஸியாக உள்ளன. சில நிமிடங்கள் கழித்து மீண்டும் அழைக்கவும்.",
+        "busy_retry": "மன்னிக்கவும், இப்போது சற்று பிஸியாக உள்ளோம். சிறிது நேரம் கழித்து மீண்டும் சொல்லுங்கள்."
+    }
+}
+
+# Said when a turn fails on our side: "not_heard" before repeating the question
+# when the caller's audio could not be transcribed (nothing they said is kept),
+# "went_wrong" when a phone-call turn failed, "not_saved" when the finished
+# application could not be saved
+SERVICE_ERROR_MESSAGES = {
+    "en": {
+        "not_heard": "Sorry, I couldn't hear that properly. Let me ask again. {question}",
+        "went_wrong": "Sorry, something went wrong on our side. Could you please say that again?",
+        "not_saved": "Sorry, something went wrong and we couldn't save your application. Please call again in a few minutes."
+    },
+    "hi": {
+        "not_heard": "क्षमा करें, मैं ठीक से सुन नहीं पाया। मैं फिर से पूछता हूं। {question}",
+        "went_wrong": "क्षमा करें, हमारी ओर से कुछ गड़बड़ हो गई। कृपया फिर से बोलें?",
+        "not_saved": "क्षमा करें, कुछ गड़बड़ हो गई और हम आपका आवेदन सहेज नहीं पाए। कृपया कुछ मिनट बाद फिर से कॉल करें।"
+    },
+    "ta": {
+        "not_heard": "மன்னிக்கவும், சரியாகக் கேட்கவில்லை. நான் மீண்டும் கேட்கிறேன். {question}",
+        "went_wrong": "மன்னிக்கவும், எங்கள் பக்கம் ஏதோ தவறு நடந்தது. மீண்டும் சொல்ல முடியுமா?",
+        "not_saved": "மன்னிக்கவும், ஏதோ தவறு நடந்ததால் உங்கள் விண்ணப்பத்தை சேமிக்க முடியவில்லை. சில நிமிடங்கள் கழித்து மீண்டும் அழைக்கவும்."
+    }
+}
+
+# Offered when a caller whose earlier call dropped calls back (see ivr_handler.resume_session)
+RESUME_MESSAGES = {
+    "en": {
+        "offer": "Welcome back to MASON! Last time we got as far as your {field}. Would you like to continue from there? Please say yes or no.",
+        "continue": "Great, let's continue. {question}",
+        "restart": "No problem, let's start again. {question}"
+    },
+    "hi": {
+        "offer": "MASON में आपका फिर से स्वागत है! पिछली बार हम आपके {field} तक पहुंचे थे। क्या आप वहीं से आगे बढ़ना चाहेंगे? कृपया हाँ या नहीं कहें।",
+        "continue": "बहुत अच्छा, आगे बढ़ते हैं। {question}",
+        "restart": "कोई बात नहीं, फिर से शुरू करते हैं। {question}"
+    },
+    "ta": {
+        "offer": "MASON க்கு மீண்டும் வரவேற்கிறோம்! கடந்த முறை உங்கள் {field} வரை வந்தோம். அங்கிருந்து தொடர விரும்புகிறீர்களா? ஆம் அல்லது இல்லை என்று சொல்லுங்கள்.",
+        "continue": "அருமை, தொடரலாம். {question}",
+        "restart": "பரவாயில்லை, மீண்டும் தொடங்கலாம். {question}"
+    }
+}
+
 # Language-specific confirmation words
 CONFIRMATION_WORDS = {
     "en": {
@@ -90,6 +167,14 @@ CONFIRMATION_WORDS = {
     }
 }
 
+# Minimum recognizer confidence to accept an answer without a confirmation turn.
+# Names and addresses are easy to mishear, so they need a clearer transcript.
+CONFIDENCE_THRESHOLDS = {
+    "en": {"name": 0.90, "age": 0.85, "number": 0.90, "address": 0.92, "pay": 0.85},
+    "hi": {"name": 0.92, "age": 0.88, "number": 0.92, "address": 0.94, "pay": 0.88},
+    "ta": {"name": 0.93, "age": 0.90, "number": 0.93, "address": 0.95, "pay": 0.90}
+}
+
 # Google Cloud Speech-to-Text language codes
 LANGUAGE_CODES = {
     "en": "en-IN",  # Indian English
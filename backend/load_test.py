@@ -0,0 +1,313 @@
+"""End-to-end load test for the IVR API with in-process fakes.
+
+Drives /ivr/start -> /ivr x N -> completion for many simulated callers against
+the FastAPI app in this process. Google Speech-to-Text, gTTS and Supabase are
+replaced by fakes with configurable latency, so no credentials or network are
+needed. The prompt cache and admission control stay in the path, as in
+production. Reports turn latency percentiles, throughput and memory per session.
+
+Usage (beyond MAX_ACTIVE_SESSIONS callers at once, the rest are told to call back):
+    MAX_ACTIVE_SESSIONS=2000 python load_test.py --callers 2000 --asr-latency 0.3 --tts-latency 0.2 --db-latency 0.05
+    python load_test.py --callers 500 --language hi --confidence 0.99 --json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+from language_config import QUESTIONS, CONFIRMATION_WORDS
+
+# Answers each simulated caller gives, per language
+ANSWERS = {
+    "en": {"name": "Ravi Kumar", "age": "thirty two", "number": "9841234567",
+           "address": "12 MG Road, Chennai", "pay": "twenty five thousand"},
+    "hi": {"name": "रवि कुमार", "age": "बत्तीस", "number": "9841234567",
+           "address": "चेन्नई", "pay": "पच्चीस हज़ार"},
+    "ta": {"name": "ரவி", "age": "முப்பத்திரண்டு", "number": "9841234567",
+           "address": "சென்னை", "pay": "இருபத்தைந்து ஆயிரம்"},
+}
+
+class FakeServices:
+    """Latency settings and call counts shared by the fake ASR, TTS and database."""
+
+    def __init__(self, asr_latency=0.0, tts_latency=0.0, db_latency=0.0,
+                 jitter=0.0, confidence=0.0):
+        self.asr_latency = asr_latency
+        self.tts_latency = tts_latency
+        self.db_latency = db_latency
+        self.jitter = jitter
+        self.confidence = confidence
+        self.records = []
+        self.audio_files = []
+        self.calls = {"asr": 0, "tts": 0, "db": 0}
+        self._lock = threading.Lock()  # Fakes run on the server's worker threads
+
+    def count(self, service: str):
+        with self._lock:
+            self.calls[service] += 1
+
+    def wait(self, latency: float):
+        """Block like the real SDK calls do."""
+        if latency > 0:
+            time.sleep(latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def transcribe(self, file_path, language_code="en-IN", sample_rate_hertz=48000):
+        # Simulated callers upload their answer text as the "audio"
+        from transcribe_module import TranscriptionResult
+
+        self.count("asr")
+        self.wait(self.asr_latency)
+        with open(file_path, "rb") as audio_file:
+            text = audio_file.read().decode("utf-8")
+        return TranscriptionResult(text, confidence=self.confidence)
+
+    def synthesize(self, text, language="en"):
+        import ivr_handler
+
+        self.count("tts")
+        self.wait(self.tts_latency)
+        # An empty file, so the prompt cache sees a real path
+        path = ivr_handler.AUDIO_STORE.new_path(".mp3")
+        self.audio_files.append(path)
+        return path
+
+    def remove_audio(self):
+        for path in self.audio_files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def insert_record(self, **fields):
+        self.count("db")
+        self.wait(self.db_latency)
+        with self._lock:
+            row = dict(fields, id=len(self.records) + 1)
+            self.records.append(row)
+        return [row]
+
+    def database_module(self):
+        """Stand-in for database.py, so importing app needs no Supabase credentials."""
+        module = types.ModuleType("database")
+        module.insert_record = self.insert_record
+        module.get_client = lambda: None
+        module.get_masons = lambda: list(self.records)
+        module.get_masons_since = lambda last_id, limit: [r for r in self.records if r["id"] > last_id][:limit]
+        module.get_masons_by_ids = lambda ids: [self.records[i - 1] for i in ids]
+        module.get_employer_profile = lambda emp_id: None
+        module.get_employer_by_id = lambda emp_id: None
+        module.add_employer_login = lambda email, password: ([], "fake-emp")
+        module.add_employer_profile = lambda *args: []
+        module.checklogin = lambda email, password: None
+        module.update_contact_status = lambda mason_id, status: {"status": "success", "updated": True}
+        return module
+
+
+def install_fakes(services: FakeServices):
+    """Swap the external services for fakes and return the FastAPI app."""
+    if "app" in sys.modules:
+        raise RuntimeError("install_fakes must run before app is imported")
+    sys.modules["database"] = services.database_module()
+
+    import app
+    import ivr_handler
+
+    app.transcribe_audio = services.transcribe
+    ivr_handler.render_speech = services.synthesize
+    return app.app
+
+
+def choose_reply(assistant_text: str, language: str, last_reply: str) -> str:
+    """Answer the prompt like a cooperative caller would."""
+    answers = ANSWERS[language]
+    for field, question in QUESTIONS[language].items():
+        if assistant_text.endswith(question):
+            return answers[field]
+    yes = CONFIRMATION_WORDS[language]["yes"][0]
+    if f"'{yes}'" in assistant_text:
+        return yes
+    # Validation error: say the same thing again
+    return last_reply
+
+
+class Stats:
+    def __init__(self):
+        self.turn_latencies = []  # Answered turns only; busy replies are counted below
+        self.completed = 0
+        self.failed = 0
+        self.refused = 0  # Told to call back at /ivr/start
+        self.busy_retries = 0  # Turns the server asked to repeat
+        self.busy_wait = 0.0  # Seconds callers waited before repeating them
+        self.active = 0
+        self.peak_active = 0
+
+
+async def run_caller(client, caller_id: int, language: str, max_turns: int,
+                     think_time: float, stats: Stats):
+    """One simulated call from /ivr/start to completion."""
+    session_id = f"load-{caller_id}"
+    stats.active += 1
+    stats.peak_active = max(stats.peak_active, stats.active)
+    try:
+        started = time.perf_counter()
+        response = await client.post("/ivr/start", data={"session_id": session_id, "language": language})
+        if response.status_code == 503:
+            stats.refused += 1
+            return
+        stats.turn_latencies.append(time.perf_counter() - started)
+        body = response.json()
+
+        reply = ""
+        turns = 0
+        while turns < max_turns:
+            # Caller listens to the prompt and answers; also lets other calls interleave
+            await asyncio.sleep(think_time)
+            reply = choose_reply(body.get("assistant_text", ""), language, reply)
+            files = {"file": ("turn.webm", reply.encode("utf-8"), "audio/webm")}
+            started = time.perf_counter()
+            response = await client.post("/ivr", data={"session_id": session_id}, files=files)
+            if response.status_code == 503:
+                # Over capacity before anything changed: wait as asked, then say the same thing again
+                wait = max(think_time, float(response.headers.get("Retry-After", 1)))
+                stats.busy_retries += 1
+                stats.busy_wait += wait
+                await asyncio.sleep(wait)
+                continue
+            stats.turn_latencies.append(time.perf_counter() - started)
+            turns += 1
+            body = response.json()
+            if body.get("status") == "error":
+                break
+            if body.get("finished"):
+                stats.completed += 1
+                return
+        stats.failed += 1
+    finally:
+        stats.active -= 1
+
+
+def measure_session_memory(count: int = 1000) -> float:
+    """Bytes of IVR state held per in-progress session."""
+    import ivr_handler
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        session = ivr_handler.start_session(f"memory-{i}")
+        session.update(ANSWERS["en"])
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    for i in range(count):
+        ivr_handler.reset_session(f"memory-{i}")
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return allocated / count
+
+
+def percentile(values, pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0  # Every call refused: nothing was timed
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+async def run_load_test(args) -> dict:
+    import httpx
+
+    services = FakeServices(args.asr_latency, args.tts_latency, args.db_latency,
+                            args.jitter, args.confidence)
+    app = install_fakes(services)
+    # Normally done at server startup, which the in-process transport skips
+    import admission
+    import anyio
+    anyio.to_thread.current_default_thread_limiter().total_tokens = admission.threadpool_size()
+    # One INFO line per request from the test client would drown the app's own logs
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    stats = Stats()
+    limit = asyncio.Semaphore(args.concurrency or args.callers)
+
+    async def limited_caller(client, caller_id):
+        async with limit:
+            await run_caller(client, caller_id, args.language, args.max_turns, args.think_time, stats)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(limited_caller(client, i) for i in range(args.callers)))
+        elapsed = time.perf_counter() - started
+    services.remove_audio()
+
+    latencies = stats.turn_latencies
+    return {
+        "callers": args.callers,
+        "completed": stats.completed,
+        "failed": stats.failed,
+        "refused": stats.refused,
+        "busy_retries": stats.busy_retries,
+        "busy_wait_s": stats.busy_wait,
+        "records_saved": len(services.records),
+        "turns": len(latencies),
+        "turns_per_call": len(latencies) / max(1, args.callers - stats.refused),  # Refused calls take no turns
+        "elapsed_s": elapsed,
+        "turns_per_s": len(latencies) / elapsed,
+        "calls_per_s": stats.completed / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "peak_active_calls": stats.peak_active,
+        "session_state_bytes": measure_session_memory(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "service_calls": services.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the IVR API with fake ASR, TTS and database")
+    parser.add_argument("--callers", type=int, default=1000, help="Simulated calls to run")
+    parser.add_argument("--concurrency", type=int, default=0, help="Max calls in flight (default: all)")
+    parser.add_argument("--language", choices=sorted(ANSWERS), default="en")
+    parser.add_argument("--asr-latency", type=float, default=0.0, help="Seconds per transcription")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="Seconds per TTS prompt")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Seconds per database insert")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency jitter as a fraction, e.g. 0.2")
+    parser.add_argument("--confidence", type=float, default=0.0,
+                        help="Recognizer confidence the fake ASR reports (high values skip confirmations)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Seconds a caller spends listening and answering between turns")
+    parser.add_argument("--max-turns", type=int, default=30, help="Give up on a call after this many turns")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 60)
+    print("IVR Load Test")
+    print("=" * 60)
+    print(f"Calls:            {results['completed']}/{results['callers']} completed, {results['failed']} failed, "
+          f"{results['refused']} told to call back")
+    print(f"Busy retries:     {results['busy_retries']} ({results['busy_wait_s']:.1f} s waited, "
+          f"not in turn latency)")
+    print(f"Records saved:    {results['records_saved']}")
+    print(f"Turns:            {results['turns']} ({results['turns_per_call']:.1f} per call)")
+    print(f"Elapsed:          {results['elapsed_s']:.2f} s")
+    print(f"Throughput:       {results['turns_per_s']:.1f} turns/s, {results['calls_per_s']:.1f} calls/s")
+    print(f"Turn latency:     p50 {results['p50_ms']:.1f} ms, p95 {results['p95_ms']:.1f} ms, "
+          f"p99 {results['p99_ms']:.1f} ms, max {results['max_ms']:.1f} ms")
+    print(f"Peak active calls: {results['peak_active_calls']}")
+    print(f"Session state:    {results['session_state_bytes']:.0f} bytes/session")
+    print(f"Peak RSS:         {results['peak_rss_mb']:.1f} MB")
+    print(f"Service calls:    {results['service_calls']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Application logging: non-blocking, level-controlled and PII-safe.
+
+Log calls only put records on a queue; a background listener thread does the
+formatting and writing, so slow stdout never stalls a request. Configured
+from the environment by setup_logging():
+
+    LOG_LEVEL                root level (default INFO)
+    LOG_LEVELS               per-module levels, e.g. "ivr_handler=DEBUG,transcribe_module=WARNING"
+    LOG_FORMAT               "color", "plain" or "json" (default: color on a terminal, else plain)
+    LOG_DEBUG_SAMPLE_RATE    fraction of DEBUG records kept (default 1.0)
+    LOG_REDACT               set to 0 to log caller details unmasked (local debugging only)
+
+Caller details are passed as extra fields (extra={"transcript": ...}) rather
+than formatted into the message. Fields named in PII_FIELDS, at the top level
+or inside a dict such as the session's fields, are masked before the record
+leaves the calling thread.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+
+# Fields that identify the caller ("name" itself is reserved on log records,
+# so top-level extras use caller_name)
+PII_FIELDS = {"name", "caller_name", "number", "caller", "address", "transcript"}
+
+# Phone numbers and other long digit runs inside free text
+_DIGITS_RE = re.compile(r"\d[\d ]{5,}\d")
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+def redact(value):
+    """Mask a caller-supplied value, keeping only enough to tell values apart."""
+    if value is None or value == "":
+        return value
+    text = str(value)
+    digits = re.sub(r"\D", "", text)
+    if len(digits) >= 6:
+        return "*" * (len(digits) - 2) + digits[-2:]
+    return f"{text[0]}***" if len(text) > 1 else "*"
+
+
+def redact_fields(fields: dict) -> dict:
+    """Copy of fields with PII values masked, including inside nested dicts."""
+    masked = {}
+    for key, value in fields.items():
+        if isinstance(value, dict):
+            masked[key] = redact_fields(value)
+        elif key in PII_FIELDS:
+            masked[key] = redact(value)
+        else:
+            masked[key] = value
+    return masked
+
+
+def extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class RedactionFilter(logging.Filter):
+    """Mask PII extra fields and long digit runs in the message."""
+
+    def filter(self, record):
+        for key, value in redact_fields(extra_fields(record)).items():
+            setattr(record, key, value)
+        message = record.getMessage()
+        masked = _DIGITS_RE.sub(lambda m: redact(m.group()), message)
+        if masked != message:
+            record.msg, record.args = masked, None
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with extra fields appended as key=value."""
+
+    def format(self, record):
+        line = super().format(record)
+        extras = extra_fields(record)
+        if extras:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in extras.items())
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                    + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(extra_fields(record))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def _console_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JSONFormatter()
+    if log_format == "color":
+        try:
+            import coloredlogs
+        except ImportError:
+            pass
+        else:
+            class ColoredTextFormatter(TextFormatter, coloredlogs.ColoredFormatter):
+                pass
+            return ColoredTextFormatter(TEXT_FORMAT)
+    return TextFormatter(TEXT_FORMAT)
+
+
+def parse_levels(spec: str) -> dict:
+    """Parse "module=LEVEL,other=LEVEL" into {module: LEVEL}."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level: str = None, module_levels: dict = None, log_format: str = None,
+                  debug_sample_rate: float = None, redact_pii: bool = None, stream=None):
+    """
+    Route all logging through a queue to a background writer thread.
+
+    Arguments override the matching environment variables. Safe to call more
+    than once; later calls replace the earlier configuration.
+    """
+    global _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if module_levels is None:
+        module_levels = parse_levels(os.getenv("LOG_LEVELS", ""))
+    stream = stream or sys.stderr
+    if log_format is None:
+        log_format = os.getenv("LOG_FORMAT") or ("color" if stream.isatty() else "plain")
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    if redact_pii is None:
+        redact_pii = os.getenv("LOG_REDACT", "1") != "0"
+
+    shutdown_logging()
+
+    console = logging.StreamHandler(stream)
+    console.setFormatter(_console_formatter(log_format))
+
+    # Filters run in the calling thread, before the record is queued
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(DebugSampler(debug_sample_rate))
+    if redact_pii:
+        queue_handler.addFilter(RedactionFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, console, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,297 @@
+"""Phone-call audio over Twilio Media Streams.
+
+Twilio sends 8 kHz mono μ-law audio as base64 JSON frames over a WebSocket.
+This module decodes the frames, detects the end of each caller utterance,
+runs it through transcription and the IVR state machine, and streams the
+spoken reply back as μ-law frames. Callers can talk over a prompt: once the
+VAD hears speech the queued prompt audio is cleared and recognition starts.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import tempfile
+import wave
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+
+import admission
+from admission import LIMITERS, OverCapacity
+from ivr_handler import (
+    process_turn, repeat_turn, reset_session, get_initial_question, get_session, application_saved, SESSION_STORE,
+)
+from language_config import LANGUAGE_CODES, CAPACITY_MESSAGES, SERVICE_ERROR_MESSAGES
+from metrics import span, turn_labels
+from resilience import deadline, ServiceError, TranscriptionError, TURN_BUDGET_S
+from vad import VoiceActivityDetector, SPEECH_START, SPEECH_END
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 8000
+FRAME_SAMPLES = 160  # 20 ms at 8 kHz, Twilio's frame size
+TTS_SAMPLE_RATE = 24000  # OpenAI "pcm" output
+OUTBOUND_CHUNK_BYTES = SAMPLE_RATE  # Send prompts in 1 second media messages
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """G.711 μ-law decode table for all 256 codes."""
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = ((mantissa << 3) + _MULAW_BIAS) << exponent
+    samples = magnitude - _MULAW_BIAS
+    return np.where(codes & 0x80, -samples, samples).astype(np.int16)
+
+
+MULAW_DECODE_TABLE = _build_mulaw_table()
+
+
+def mulaw_decode(payload: bytes) -> np.ndarray:
+    """Decode μ-law bytes to 16-bit PCM samples."""
+    return MULAW_DECODE_TABLE[np.frombuffer(payload, dtype=np.uint8)]
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """Encode 16-bit PCM samples to μ-law bytes."""
+    samples = samples.astype(np.int32)
+    sign = (samples < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(samples), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.clip(np.frexp(magnitude)[1] - 8, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    codes = ~(sign | (exponent << 4) | mantissa) & 0xFF
+    return codes.astype(np.uint8).tobytes()
+
+
+def pcm_to_telephony(pcm: bytes, sample_rate: int = TTS_SAMPLE_RATE) -> bytes:
+    """Downsample 16-bit PCM to 8 kHz and encode it as μ-law."""
+    samples = np.frombuffer(pcm, dtype="<i2")
+    factor = sample_rate // SAMPLE_RATE
+    if factor > 1:
+        # Box-filter decimation: average each group of input samples
+        samples = samples[: len(samples) - len(samples) % factor]
+        samples = samples.reshape(-1, factor).mean(axis=1)
+    return mulaw_encode(samples)
+
+
+def write_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
+    """Write 16-bit mono PCM to a temporary WAV file and return its path."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+        path = tmp.name
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype("<i2").tobytes())
+    return path
+
+
+class MediaStreamCall:
+    """
+    One phone call on a Twilio media stream.
+
+    transcribe, synthesize and save_record are the ASR, TTS and database
+    callables (transcribe_audio, tts_module.synthesize_pcm and
+    insert_record_handler in production). authorize(call_sid, caller,
+    language, token) checks the stream parameters before the caller is
+    greeted (twilio_auth.valid_stream in production); a refused stream is
+    closed. With barge_in=False the caller is ignored until each prompt has
+    finished playing.
+    """
+
+    def __init__(self, websocket, transcribe, synthesize, save_record, authorize=None,
+                 barge_in: bool = True):
+        self.websocket = websocket
+        self.transcribe = transcribe
+        self.synthesize = synthesize
+        self.save_record = save_record
+        self.authorize = authorize
+        self.barge_in = barge_in
+        self.vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE)
+        self.stream_sid = None
+        self.session_id = None
+        self.language = "en"
+        self.playing = False  # Prompt audio queued on Twilio's side
+        self.responding = False  # Utterance being transcribed/answered
+        self.finished = False
+        self.closed = False
+        self._marks = 0
+        self._task = None
+
+    async def run(self):
+        """Handle stream events until Twilio stops the stream or hangs up."""
+        try:
+            while not self.closed:
+                message = json.loads(await self.websocket.receive_text())
+                event = message.get("event")
+                if event == "start":
+                    await self.on_start(message)
+                elif event == "media":
+                    await self.on_media(message)
+                elif event == "mark":
+                    await self.on_mark(message)
+                elif event == "stop":
+                    break
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if self._task:
+                self._task.cancel()
+            if self.session_id and not self.finished:
+                await run_in_threadpool(reset_session, self.session_id)
+
+    async def on_start(self, message: dict):
+        start = message["start"]
+        params = start.get("customParameters", {})
+        self.stream_sid = message.get("streamSid") or start.get("streamSid")
+        self.session_id = params.get("session_id") or start.get("callSid") or self.stream_sid
+        self.language = params.get("language", "en")
+        caller = params.get("caller")  # Caller ID, for resuming a dropped call
+        if self.authorize and not self.authorize(start.get("callSid", ""), caller or "",
+                                                 self.language, params.get("token")):
+            logger.warning("Rejected unauthorized media stream", extra={"session_id": self.session_id})
+            self.session_id = None  # Nothing of this call to clean up
+            self.closed = True
+            await self.websocket.close(code=1008)
+            return
+        if self.language not in LANGUAGE_CODES:
+            self.language = "en"
+
+        logger.info("Media stream started", extra={"session_id": self.session_id, "language": self.language})
+        try:
+            result = await run_in_threadpool(
+                admission.admit_call, lambda: admission.active_sessions(SESSION_STORE),
+                lambda: get_initial_question(self.session_id, self.language, synthesize=False, caller=caller),
+            )
+        except OverCapacity:
+            # Say so and hang up once the message has played
+            self.finished = True
+            await self.say(CAPACITY_MESSAGES[self.language]["call_back"])
+            return
+
+        await self.say(result["assistant_text"])
+
+    async def on_media(self, message: dict):
+        media = message["media"]
+        if media.get("track", "inbound") != "inbound" or self.responding or self.finished:
+            return
+        if self.playing and not self.barge_in:
+            return
+
+        samples = mulaw_decode(base64.b64decode(media["payload"]))
+        for event, utterance in self.vad.feed(samples):
+            if event == SPEECH_START and self.playing:
+                await self.interrupt_prompt()
+            elif event == SPEECH_END:
+                self.responding = True
+                self._task = asyncio.create_task(self.respond(utterance))
+
+    async def interrupt_prompt(self):
+        """Barge-in: drop the prompt audio Twilio still has queued."""
+        logger.debug("Barge-in", extra={"session_id": self.session_id})
+        self.playing = False
+        await self.websocket.send_text(json.dumps({"event": "clear", "streamSid": self.stream_sid}))
+
+    async def on_mark(self, message: dict):
+        if message.get("mark", {}).get("name") == f"prompt-{self._marks}":
+            self.playing = False
+            if self.finished:
+                # Goodbye has played; ending the stream ends the call
+                self.closed = True
+                await self.websocket.close()
+
+    async def respond(self, utterance: np.ndarray):
+        """Transcribe one utterance, advance the IVR and speak the reply."""
+        try:
+            with deadline(TURN_BUDGET_S):
+                current_field = ""
+                try:
+                    # Inside the try: if the session store is down, the caller still hears why
+                    session = await run_in_threadpool(get_session, self.session_id)
+                    current_field = session.get("current_field", "") if session else ""
+                    with turn_labels(self.language, current_field):
+                        reply = await self.take_turn(utterance, session)
+                except ServiceError as e:
+                    logger.warning("Turn failed: %s", e, extra={"session_id": self.session_id})
+                    reply = self.failure_reply()
+                except Exception:
+                    logger.exception("Turn failed", extra={"session_id": self.session_id})
+                    reply = self.failure_reply()
+                self.vad.reset()
+                with turn_labels(self.language, current_field):
+                    await self.say(reply)
+        finally:
+            self.responding = False
+
+    async def take_turn(self, utterance: np.ndarray, session) -> str:
+        """Run one utterance through ASR and the IVR; returns the text to say next."""
+        with span("disk_write"):
+            path = write_wav(utterance)
+        try:
+            language_code = LANGUAGE_CODES.get(self.language, "en-IN")
+            with span("asr"):
+                transcription = await LIMITERS["asr"].run(
+                    self.transcribe, path, language_code, sample_rate_hertz=SAMPLE_RATE
+                )
+        except OverCapacity:
+            return CAPACITY_MESSAGES[self.language]["busy_retry"]
+        except TranscriptionError as e:
+            logger.warning("Transcription failed, asking again: %s", e, extra={"session_id": self.session_id})
+            transcription = None
+        finally:
+            os.remove(path)
+
+        if transcription is None or not transcription.text.strip():
+            # Nothing recognisable was said: that is not an answer, ask again
+            result = await run_in_threadpool(repeat_turn, self.session_id, session=session, synthesize=False)
+        else:
+            result = await run_in_threadpool(
+                process_turn, self.session_id, transcription.text,
+                transcription.confidence, synthesize=False, session=session
+            )
+        if result["finished"]:
+            self.finished = True
+            with span("db_insert"):
+                await run_in_threadpool(self.save_record, result["fields"], result["resume_token"])
+            await run_in_threadpool(application_saved, result["resume_token"])
+        return result["assistant_text"]
+
+    def failure_reply(self) -> str:
+        """What to say when a turn failed on our side."""
+        if self.finished:
+            # The answers are all in but could not be saved; hang up after saying so
+            return SERVICE_ERROR_MESSAGES[self.language]["not_saved"]
+        return SERVICE_ERROR_MESSAGES[self.language]["went_wrong"]
+
+    async def say(self, text: str):
+        """Synthesize text and stream it to the caller, followed by a mark."""
+        try:
+            with span("tts", language=self.language):
+                audio = pcm_to_telephony(await LIMITERS["tts"].run(self.synthesize, text))
+        except (OverCapacity, ServiceError) as e:
+            # Nothing to play; the caller can speak again
+            logger.warning("Prompt skipped: %s", e, extra={"session_id": self.session_id})
+            if self.finished:
+                self.closed = True
+                await self.websocket.close()
+            return
+        self.playing = True
+        for offset in range(0, len(audio), OUTBOUND_CHUNK_BYTES):
+            await self.websocket.send_text(json.dumps({
+                "event": "media",
+                "streamSid": self.stream_sid,
+                "media": {"payload": base64.b64encode(audio[offset:offset + OUTBOUND_CHUNK_BYTES]).decode("ascii")},
+            }))
+        # Twilio echoes the mark back once playback reaches it
+        self._marks += 1
+        await self.websocket.send_text(json.dumps({
+            "event": "mark",
+            "streamSid": self.stream_sid,
+            "mark": {"name": f"prompt-{self._marks}"},
+        }))
@@ -0,0 +1,331 @@
+"""Spoken-number parsing for IVR answers in English, Hindi and Tamil.
+
+Transcripts rarely come back as clean digits: callers say "twenty five
+thousand", "पच्चीस हज़ार", "nine eight four one..." or mix scripts. This module
+turns those into values so the age, phone number and pay questions do not need
+another round trip.
+"""
+
+import re
+import unicodedata
+
+# Token kinds
+NUMBER = "number"          # adds to the running value (0-99, Tamil hundreds)
+MULTIPLIER = "multiplier"  # hundred, thousand, lakh, crore
+FILLER = "filler"          # "and" in "two hundred and fifty"
+REPEAT = "repeat"          # "double five" -> 55 when reading phone numbers
+ZERO_ALIAS = "zero_alias"  # "oh" in "nine eight oh one"
+POINT = "point"            # "one point five lakh"
+HALF = "half"              # "twelve and a half thousand"
+FRACTION = "fraction"      # सवा, साढ़े, पौने: quarter, half or quarter less on the next number
+
+_ENGLISH_WORDS = {
+    "zero": 0, "nought": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fourty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+
+_ENGLISH_MULTIPLIERS = {
+    "hundred": 100, "thousand": 1000, "k": 1000, "lakh": 100000,
+    "lakhs": 100000, "lac": 100000, "lacs": 100000, "million": 1000000,
+    "crore": 10000000, "crores": 10000000,
+}
+
+_HINDI_WORDS = {
+    "शून्य": 0, "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पाँच": 5, "पांच": 5,
+    "छह": 6, "छः": 6, "छे": 6, "सात": 7, "आठ": 8, "नौ": 9, "दस": 10,
+    "ग्यारह": 11, "बारह": 12, "तेरह": 13, "चौदह": 14, "पंद्रह": 15,
+    "पन्द्रह": 15, "सोलह": 16, "सत्रह": 17, "अठारह": 18, "उन्नीस": 19,
+    "बीस": 20, "इक्कीस": 21, "बाईस": 22, "तेईस": 23, "चौबीस": 24,
+    "पच्चीस": 25, "छब्बीस": 26, "सत्ताईस": 27, "अट्ठाईस": 28, "उनतीस": 29,
+    "तीस": 30, "इकतीस": 31, "बत्तीस": 32, "तैंतीस": 33, "चौंतीस": 34,
+    "पैंतीस": 35, "छत्तीस": 36, "सैंतीस": 37, "अड़तीस": 38, "उनतालीस": 39,
+    "चालीस": 40, "इकतालीस": 41, "बयालीस": 42, "तैंतालीस": 43, "चवालीस": 44,
+    "पैंतालीस": 45, "छियालीस": 46, "सैंतालीस": 47, "अड़तालीस": 48,
+    "उनचास": 49, "पचास": 50, "इक्यावन": 51, "बावन": 52, "तिरेपन": 53,
+    "चौवन": 54, "पचपन": 55, "छप्पन": 56, "सत्तावन": 57, "अट्ठावन": 58,
+    "उनसठ": 59, "साठ": 60, "इकसठ": 61, "बासठ": 62, "तिरेसठ": 63,
+    "चौंसठ": 64, "पैंसठ": 65, "छियासठ": 66, "सड़सठ": 67, "अड़सठ": 68,
+    "उनहत्तर": 69, "सत्तर": 70, "इकहत्तर": 71, "बहत्तर": 72, "तिहत्तर": 73,
+    "चौहत्तर": 74, "पचहत्तर": 75, "छिहत्तर": 76, "सतहत्तर": 77,
+    "अठहत्तर": 78, "उन्यासी": 79, "अस्सी": 80, "इक्यासी": 81, "बयासी": 82,
+    "तिरासी": 83, "चौरासी": 84, "पचासी": 85, "छियासी": 86, "सत्तासी": 87,
+    "अट्ठासी": 88, "नवासी": 89, "नब्बे": 90, "इक्यानवे": 91, "बानवे": 92,
+    "तिरानवे": 93, "चौरानवे": 94, "पचानवे": 95, "छियानवे": 96,
+    "सत्तानवे": 97, "अट्ठानवे": 98, "निन्यानवे": 99,
+    # Fractions used for amounts ("ढाई हज़ार" = 2500)
+    "डेढ़": 1.5, "डेढ": 1.5, "ढाई": 2.5,
+}
+
+# Added to the number that follows: "साढ़े बारह हज़ार" = 12500, "सवा लाख" = 125000,
+# "पौने दो हज़ार" = 1750
+_HINDI_FRACTIONS = {
+    "सवा": 0.25, "साढ़े": 0.5, "साढे": 0.5, "पौने": -0.25, "पौन": -0.25,
+}
+
+_HINDI_MULTIPLIERS = {
+    "सौ": 100, "हज़ार": 1000, "हजार": 1000, "लाख": 100000,
+    "करोड़": 10000000, "करोड": 10000000,
+}
+
+_TAMIL_WORDS = {
+    "பூஜ்ஜியம்": 0, "பூஜ்யம்": 0, "ஒன்று": 1, "ஒண்ணு": 1, "இரண்டு": 2,
+    "ரெண்டு": 2, "மூன்று": 3, "மூணு": 3, "நான்கு": 4, "நாலு": 4,
+    "ஐந்து": 5, "அஞ்சு": 5, "ஆறு": 6, "ஏழு": 7, "எட்டு": 8, "ஒன்பது": 9,
+    "பத்து": 10, "பதினொன்று": 11, "பன்னிரண்டு": 12, "பதின்மூன்று": 13,
+    "பதினான்கு": 14, "பதினைந்து": 15, "பதினாறு": 16, "பதினேழு": 17,
+    "பதினெட்டு": 18, "பத்தொன்பது": 19, "இருபது": 20, "முப்பது": 30,
+    "நாற்பது": 40, "ஐம்பது": 50, "அறுபது": 60, "எழுபது": 70, "எண்பது": 80,
+    "தொண்ணூறு": 90, "இருநூறு": 200, "முந்நூறு": 300, "நானூறு": 400,
+    "ஐநூறு": 500, "அறுநூறு": 600, "எழுநூறு": 700, "எண்ணூறு": 800,
+    "தொள்ளாயிரம்": 900,
+    # Combining forms of the tens ("இருபத்தி ஐந்து", "இருபத்தைந்து")
+    "இருபத்தி": 20, "இருபத்து": 20, "இருபத்": 20,
+    "முப்பத்தி": 30, "முப்பத்து": 30, "முப்பத்": 30,
+    "நாற்பத்தி": 40, "நாற்பத்து": 40, "நாற்பத்": 40,
+    "ஐம்பத்தி": 50, "ஐம்பத்து": 50, "ஐம்பத்": 50,
+    "அறுபத்தி": 60, "அறுபத்து": 60, "அறுபத்": 60,
+    "எழுபத்தி": 70, "எழுபத்து": 70, "எழுபத்": 70,
+    "எண்பத்தி": 80, "எண்பத்து": 80, "எண்பத்": 80,
+    "தொண்ணூற்றி": 90, "தொண்ணூற்று": 90, "தொண்ணூற்": 90,
+    # Units after sandhi with the tens stems above
+    "தொன்று": 1, "திரண்டு": 2, "தைந்து": 5, "தாறு": 6, "தேழு": 7,
+    "தெட்டு": 8, "தொன்பது": 9, "றொன்று": 1, "றிரண்டு": 2, "றைந்து": 5,
+    "றாறு": 6, "றேழு": 7, "றெட்டு": 8, "றொன்பது": 9,
+}
+
+_TAMIL_MULTIPLIERS = {
+    "நூறு": 100, "நூற்றி": 100, "நூற்று": 100, "ஆயிரம்": 1000,
+    "ஆயிரத்து": 1000, "ஆயிரத்தி": 1000, "லட்சம்": 100000,
+    "லட்சத்து": 100000, "லட்ச": 100000, "கோடி": 10000000,
+}
+
+_REPEAT_WORDS = {
+    "double": 2, "triple": 3, "डबल": 2, "ट्रिपल": 3, "டபுள்": 2, "ட்ரிபிள்": 3,
+}
+
+# Languages whose number words fuse into a single token ("இருபத்தைந்து")
+_FUSED_LANGUAGES = {"ta"}
+
+_TOKEN_RE = re.compile(r"\d+(?:\.\d+)*|[^\s\d,.;:!?।|()\[\]\"'/\-]+")
+
+# "10.000" or "1.50.000": dots grouping thousands, not a decimal point
+_GROUPED_RE = re.compile(r"\d{1,3}(?:\.\d{2})*\.\d{3}")
+
+
+_POINT_WORDS = {"point": 0, "दशमलव": 0, "पॉइंट": 0, "புள்ளி": 0}
+_HALF_WORDS = {"half": 0.5, "आधा": 0.5, "அரை": 0.5}
+
+
+def _build_lexicon(words: dict, multipliers: dict, fractions: dict = None) -> dict:
+    """Merge language tables with English, which callers mix in freely."""
+    lexicon = {}
+    for table, kind in (
+        (_ENGLISH_WORDS, NUMBER), (_ENGLISH_MULTIPLIERS, MULTIPLIER),
+        (words, NUMBER), (multipliers, MULTIPLIER), (_REPEAT_WORDS, REPEAT),
+        (_POINT_WORDS, POINT), (_HALF_WORDS, HALF), (fractions or {}, FRACTION),
+    ):
+        for word, value in table.items():
+            lexicon[unicodedata.normalize("NFC", word)] = (kind, value)
+    lexicon["and"] = (FILLER, 0)
+    lexicon["a"] = (FILLER, 0)  # "a thousand", "and a half"
+    lexicon["oh"] = (ZERO_ALIAS, 0)
+    lexicon["o"] = (ZERO_ALIAS, 0)
+    return lexicon
+
+
+_LEXICONS = {
+    "en": _build_lexicon({}, {}),
+    "hi": _build_lexicon(_HINDI_WORDS, _HINDI_MULTIPLIERS, _HINDI_FRACTIONS),
+    "ta": _build_lexicon(_TAMIL_WORDS, _TAMIL_MULTIPLIERS),
+}
+
+# Longest entries first so segmentation prefers "இருபத்தி" over "இருபத்"
+_SEGMENTS = {
+    lang: sorted(_LEXICONS[lang], key=len, reverse=True) for lang in _FUSED_LANGUAGES
+}
+
+
+def _segment(token: str, language: str):
+    """Split a fused number word into lexicon entries, or None if it isn't one."""
+    if not token:
+        return []
+    for entry in _SEGMENTS[language]:
+        if len(entry) > 1 and token.startswith(entry):
+            rest = _segment(token[len(entry):], language)
+            if rest is not None:
+                return [_LEXICONS[language][entry]] + rest
+    return None
+
+
+def tokenize(text: str, language: str = "en"):
+    """
+    Classify each token of a transcript.
+
+    Returns a list of (token, kind, value) where kind is None for words that
+    are not part of a number. Digit runs in any script are returned as NUMBER
+    with their digit string as token.
+    """
+    lexicon = _LEXICONS.get(language, _LEXICONS["en"])
+    text = unicodedata.normalize("NFC", text).lower()
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if token[0].isdigit():
+            if _GROUPED_RE.fullmatch(token):
+                digits = "".join(str(unicodedata.digit(ch)) for ch in token if ch != ".")
+                tokens.append((digits, NUMBER, int(digits)))
+            elif token.count(".") > 1:
+                tokens.append((token, None, None))  # Not a number we can read
+            elif "." in token:
+                tokens.append((token, NUMBER, float(token)))
+            else:
+                digits = "".join(str(unicodedata.digit(ch)) for ch in token)
+                tokens.append((digits, NUMBER, int(digits)))
+            continue
+        entry = lexicon.get(token)
+        if entry:
+            tokens.append((token, entry[0], entry[1]))
+            continue
+        segments = _segment(token, language) if language in _FUSED_LANGUAGES else None
+        if segments:
+            tokens.extend((token, kind, value) for kind, value in segments)
+        else:
+            tokens.append((token, None, None))
+    return tokens
+
+
+def _half_follows(tokens: list, i: int) -> bool:
+    """True if "half" comes next after fillers, as in "twelve and a half"."""
+    for _, kind, _ in tokens[i + 1:]:
+        if kind != FILLER:
+            return kind == HALF
+    return False
+
+
+def parse_number(text: str, language: str = "en"):
+    """
+    Parse the first spoken quantity in text, e.g. for age or pay.
+
+    Handles digits, number words, hundred/thousand/lakh/crore multipliers,
+    mixed forms such as "25 हज़ार", decimals ("one point five lakh", "2.5
+    lakh"), halves ("twelve and a half thousand") and the Hindi सवा, साढ़े
+    and पौने. Returns an int, or None if no number was said.
+    """
+    total = 0
+    current = 0
+    started = False
+    last_kind = None
+    offset = 0  # From सवा, साढ़े or पौने, applied to the number before its multiplier
+    place = None  # Value of the next digit after "point"
+
+    def apply_offset():
+        nonlocal current, offset
+        if offset:
+            current = (current or 1) + offset
+            offset = 0
+
+    tokens = tokenize(text, language)
+    for i, (token, kind, value) in enumerate(tokens):
+        if kind in (None, REPEAT, ZERO_ALIAS):
+            if started:
+                break
+            continue
+        if kind == FILLER:
+            # "and" only continues a number after a multiplier, or before "a half"
+            if started and last_kind != MULTIPLIER and not _half_follows(tokens, i):
+                break
+            continue
+        if kind == FRACTION:
+            if started:
+                break
+            offset = value
+            continue
+        if kind == POINT:
+            if last_kind != NUMBER or place is not None:
+                break
+            place = 0.1
+            last_kind = POINT
+            continue
+
+        if place is not None and kind == NUMBER:
+            # Digits after "point"
+            if not isinstance(value, int) or value > 9:
+                break
+            current += value * place
+            place /= 10
+        elif kind == HALF:
+            current += value
+        elif kind == MULTIPLIER:
+            apply_offset()
+            place = None
+            if value == 100:
+                current = (current or 1) * 100
+            else:
+                total += (current or 1) * value
+                current = 0
+        elif last_kind == NUMBER and 20 <= current < 100 and current % 10 == 0 and value < 10:
+            # "twenty five"
+            current += value
+        elif last_kind == NUMBER and isinstance(current, int) and isinstance(value, int):
+            # "three two" or "98412 34567": read as consecutive digits
+            width = len(token) if token[0].isdigit() else len(str(value))
+            current = current * 10 ** width + value
+        else:
+            current += value
+
+        started = True
+        last_kind = kind
+
+    if not started:
+        return None
+    apply_offset()
+    return int(round(total + current))
+
+
+def parse_digits(text: str, language: str = "en") -> str:
+    """
+    Read a digit sequence such as a phone number.
+
+    "nine eight four one double two", "ninety eight 41" and "९८४१" all yield
+    digit strings; words that are not numbers are skipped.
+    """
+    digits = []
+    repeat = 1
+    tokens = tokenize(text, language)
+
+    i = 0
+    while i < len(tokens):
+        token, kind, value = tokens[i]
+        i += 1
+        chunk = None
+
+        if kind == REPEAT:
+            repeat = value
+            continue
+        if kind == ZERO_ALIAS:
+            if digits:
+                chunk = "0"
+        elif kind == MULTIPLIER:
+            if digits:
+                chunk = "0" * (len(str(value)) - 1)
+        elif kind == NUMBER:
+            if token[0].isdigit():
+                chunk = token.replace(".", "")
+            elif 20 <= value < 100 and value % 10 == 0 and i < len(tokens):
+                # "ninety eight" -> "98"
+                _, next_kind, next_value = tokens[i]
+                if next_kind == NUMBER and isinstance(next_value, int) and 0 < next_value < 10:
+                    value += next_value
+                    i += 1
+                chunk = str(value)
+            elif isinstance(value, int):
+                chunk = str(value)
+
+        if chunk is not None:
+            digits.append(chunk[0] * (repeat - 1) + chunk)
+        repeat = 1
+
+    return "".join(digits)
@@ -0,0 +1,252 @@
+"""Timeouts, retries and circuit breakers for the external services.
+
+Every IVR turn runs under a deadline (see deadline()); calls to Google
+Speech, gTTS, OpenAI and Supabase take their timeout from whatever is left
+of it, so one slow dependency cannot stretch a turn past its budget. Each
+service also has a CircuitBreaker: after repeated failures, calls fail
+immediately for a while instead of waiting on a service that is down.
+
+Failures surface as ServiceError subclasses, so callers can react (ask the
+caller to repeat, reply without audio) instead of treating an error message
+as the caller's answer.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from tenacity.stop import stop_base
+
+from metrics import Gauge
+
+TURN_BUDGET_S = float(os.getenv("TURN_BUDGET_S", "8"))
+
+# Absolute time.monotonic() by which the current turn must finish
+_deadline = ContextVar("deadline", default=None)
+
+
+class ServiceError(RuntimeError):
+    """An external service failed, timed out or is switched off by its breaker."""
+
+    def __init__(self, service: str, message: str):
+        super().__init__(f"{service}: {message}")
+        self.service = service
+
+
+class TranscriptionError(ServiceError):
+    """No transcript could be produced for the caller's audio."""
+
+
+class SynthesisError(ServiceError):
+    """A prompt could not be turned into audio."""
+
+
+class DatabaseError(ServiceError):
+    """A Supabase query failed."""
+
+
+class CircuitOpenError(ServiceError):
+    """The service's breaker is open; the call was not attempted."""
+
+
+class DeadlineExceeded(ServiceError):
+    """The turn ran out of time before the call could be made."""
+
+
+# ==================== Deadlines ====================
+@contextmanager
+def deadline(seconds: float):
+    """Run the block with at most `seconds` left; nested deadlines only tighten."""
+    limit = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(limit if current is None else min(current, limit))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left(default: float) -> float:
+    """Timeout for the next call: default, capped by what is left of the deadline."""
+    current = _deadline.get()
+    if current is None:
+        return default
+    return min(default, current - time.monotonic())
+
+
+def check_deadline(service: str, minimum: float = 0.05) -> float:
+    """Raise DeadlineExceeded unless at least `minimum` seconds remain; returns the time left."""
+    left = time_left(math.inf)
+    if left < minimum:
+        raise DeadlineExceeded(service, "turn deadline exceeded")
+    return left
+
+
+# ==================== Circuit breakers ====================
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class CircuitBreaker:
+    """
+    Fail fast after failure_threshold consecutive failures.
+
+    While open, calls raise CircuitOpenError. After reset_timeout one trial
+    call is let through (half open); success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(self, service: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(self.service, "circuit open")
+                self.state = HALF_OPEN
+            elif self.state == HALF_OPEN:
+                # A trial call is already in flight
+                raise CircuitOpenError(self.service, "circuit half open")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    @contextmanager
+    def guard(self, ignore: tuple = ()):
+        """
+        Run the block as one call to the service.
+
+        Exceptions of the types in ignore (bad input, our own deadline) show
+        the service answered, so they don't count as failures.
+        """
+        self.before_call()
+        try:
+            yield
+        except (DeadlineExceeded, *ignore):
+            self.record_success()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+
+BREAKERS = {
+    service: CircuitBreaker(
+        service,
+        failure_threshold=int(os.getenv("BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("BREAKER_RESET_S", "30")),
+    )
+    for service in ("google_asr", "gtts", "openai", "supabase")
+}
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+Gauge(
+    "ivr_circuit_state",
+    "Circuit breaker state per service: 0 closed, 1 half open, 2 open.",
+    ["service"],
+    function=lambda: {(name,): _STATE_VALUES[b.state] for name, b in BREAKERS.items()},
+)
+
+
+# ==================== Retries and hedging ====================
+class stop_at_deadline(stop_base):
+    """tenacity stop condition: no retry once less than `minimum` seconds remain."""
+
+    def __init__(self, minimum: float):
+        self.minimum = minimum
+
+    def __call__(self, retry_state) -> bool:
+        return time_left(math.inf) < self.minimum
+
+
+def retrying(is_transient, attempts: int, minimum_time: float = 0.5) -> Retrying:
+    """Retry transient failures with jittered backoff, within the turn deadline."""
+    return Retrying(
+        retry=retry_if_exception(is_transient),
+        stop=stop_after_attempt(attempts) | stop_at_deadline(minimum_time),
+        wait=wait_random_exponential(multiplier=0.1, max=1.0),
+        reraise=True,
+    )
+
+
+class HedgePool:
+    """
+    Threads for hedged() that never queue work.
+
+    submit() returns None instead of waiting when every thread is busy, so
+    time spent waiting for a thread is never mistaken for a slow service.
+    """
+
+    def __init__(self, max_workers: int, name: str = "hedge"):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._free = threading.BoundedSemaphore(max_workers)
+
+    def submit(self, fn, *args):
+        """Future running fn(*args) on a free thread, or None if there is none."""
+        if not self._free.acquire(blocking=False):
+            return None
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._free.release())
+        return future
+
+
+def hedged(call, hedge_after: float, timeout: float, pool: HedgePool):
+    """
+    Run call(); if it hasn't answered after hedge_after seconds, start a
+    second identical request and return whichever finishes first.
+
+    Size the pool for two threads per concurrent caller. If no thread is
+    free, call() runs in the calling thread, unhedged; if none is free for
+    the hedge, the first request is simply awaited.
+
+    Raises TimeoutError if neither finishes within timeout, or the first
+    error if both fail.
+    """
+    context = copy_context()
+    started = time.monotonic()
+    first = pool.submit(context.copy().run, call)
+    if first is None:
+        return call()
+    attempts = [first]
+    done, _ = wait(attempts, timeout=min(hedge_after, timeout))
+    if not done:
+        hedge = pool.submit(context.copy().run, call)
+        if hedge is not None:
+            attempts.append(hedge)
+
+    errors = []
+    pending = set(attempts)
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            errors.append(future.exception())
+    if errors and not pending:
+        raise errors[0]
+    raise TimeoutError(f"no response within {timeout:.1f}s")
@@ -0,0 +1,180 @@
+"""Where in-progress IVR sessions are kept between turns.
+
+With one worker, sessions can live in process memory. When several workers
+(or several machines) serve the API, any worker may receive any turn of a
+call, so the session has to live somewhere they all share. The backend is
+chosen with SESSION_BACKEND:
+
+    memory     this process only (default, single worker)
+    sqlite     a SQLite file shared by the workers on one machine (SESSION_DB_PATH)
+    supabase   the ivr_sessions table, shared across machines
+
+A call's turns arrive one at a time (the caller waits for each reply), so a
+plain load-modify-save per turn is enough; no cross-worker locking is done.
+Sessions idle for longer than SESSION_TTL_S are treated as abandoned.
+"""
+
+import functools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", "3600"))
+
+
+class MemorySessionStore:
+    """Sessions in a dict in this process."""
+
+    def __init__(self, table: str = "ivr_sessions", ttl: float = SESSION_TTL_S):
+        self.ttl = ttl
+        self._sessions = {}  # session_id -> (session, last saved)
+
+    def get(self, session_id: str):
+        entry = self._sessions.get(session_id)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def save(self, session_id: str, session: dict):
+        self._sessions[session_id] = (session, time.time())
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def count(self, within: float = None) -> int:
+        """Sessions saved in the last `within` seconds (default: the TTL)."""
+        cutoff = time.time() - (self.ttl if within is None else within)
+        return sum(saved > cutoff for _, saved in list(self._sessions.values()))
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl
+        for session_id, (_, saved) in list(self._sessions.items()):
+            if saved < cutoff:
+                self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    """Sessions as JSON rows in a SQLite file, shared by processes on one machine."""
+
+    def __init__(self, path: str, table: str = "ivr_sessions", ttl: float = SESSION_TTL_S):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; requests run on the threadpool too
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, session_id: str):
+        row = self._connect().execute(
+            f"SELECT data FROM {self.table} WHERE session_id = ? AND updated_at > ?",
+            (session_id, time.time() - self.ttl),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id: str, session: dict):
+        self._connect().execute(
+            f"INSERT INTO {self.table} (session_id, data, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (session_id, json.dumps(session, ensure_ascii=False), time.time()),
+        )
+
+    def delete(self, session_id: str):
+        self._connect().execute(f"DELETE FROM {self.table} WHERE session_id = ?", (session_id,))
+
+    def count(self, within: float = None) -> int:
+        cutoff = time.time() - (self.ttl if within is None else within)
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM {self.table} WHERE updated_at > ?", (cutoff,)
+        ).fetchone()[0]
+
+    def purge_expired(self):
+        self._connect().execute(
+            f"DELETE FROM {self.table} WHERE updated_at <= ?", (time.time() - self.ttl,)
+        )
+
+
+def _supabase_call(method):
+    """
+    database.supabase_call (breaker, retries, DatabaseError) for a store
+    method; database is imported on first use, like the client itself.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        from database import supabase_call
+        return supabase_call()(method)(*args, **kwargs)
+    return wrapper
+
+
+class SupabaseSessionStore:
+    """
+    Sessions in the Supabase ivr_sessions table, shared across machines.
+
+    Table: ivr_sessions (session_id text primary key, data jsonb, updated_at float8)
+    """
+
+    def __init__(self, table: str = "ivr_sessions", ttl: float = SESSION_TTL_S):
+        self.table = table
+        self.ttl = ttl
+
+    def _table(self):
+        from database import get_client
+        return get_client().table(self.table)
+
+    @_supabase_call
+    def get(self, session_id: str):
+        response = (
+            self._table().select("data").eq("session_id", session_id)
+            .gt("updated_at", time.time() - self.ttl).execute()
+        )
+        return response.data[0]["data"] if response.data else None
+
+    @_supabase_call
+    def save(self, session_id: str, session: dict):
+        self._table().upsert(
+            {"session_id": session_id, "data": session, "updated_at": time.time()}
+        ).execute()
+
+    @_supabase_call
+    def delete(self, session_id: str):
+        self._table().delete().eq("session_id", session_id).execute()
+
+    @_supabase_call
+    def count(self, within: float = None) -> int:
+        cutoff = time.time() - (self.ttl if within is None else within)
+        response = (
+            self._table().select("session_id", count="exact")
+            .gt("updated_at", cutoff).execute()
+        )
+        return response.count or 0
+
+    @_supabase_call
+    def purge_expired(self):
+        self._table().delete().lte("updated_at", time.time() - self.ttl).execute()
+
+
+def get_store(table: str = "ivr_sessions", ttl: float = SESSION_TTL_S):
+    """Session store selected by SESSION_BACKEND; table names the SQLite or Supabase table."""
+    backend = os.getenv("SESSION_BACKEND", "memory")
+    if backend == "memory":
+        return MemorySessionStore(table, ttl)
+    if backend == "sqlite":
+        path = os.getenv("SESSION_DB_PATH") or os.path.join(tempfile.gettempdir(), "ivr_sessions.db")
+        return SQLiteSessionStore(path, table, ttl)
+    if backend == "supabase":
+        return SupabaseSessionStore(table, ttl)
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend!r} (expected memory, sqlite or supabase)")
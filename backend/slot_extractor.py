@@ -0,0 +1,167 @@
+"""Extract several IVR fields from a single caller utterance.
+
+Callers often answer more than was asked ("I'm Ravi, 32, from Chennai"). The
+utterance is split into clauses and each clause is matched against per-language
+cues for name, age, phone number, address and pay, so the state machine can
+skip questions that are already answered.
+"""
+
+import re
+
+from number_parser import NUMBER, MULTIPLIER, parse_number, parse_digits, tokenize
+
+# Clause boundaries: punctuation (but not digit separators) and "and"
+_CLAUSE_SPLIT_RE = re.compile(
+    r"\s*(?:,(?!\d)|;|\.(?!\d)|।|!|\?)\s*|\s+(?:and|और|மற்றும்)\s+",
+    re.IGNORECASE,
+)
+
+# Per-language cue patterns. Each exposes the field value as group "value".
+_NAME_PATTERNS = {
+    "en": [r"\b(?:my name is|my name's|name is|i am|i'm|im|this is|myself)\s+(?P<value>.+)$"],
+    "hi": [r"मेरा नाम\s+(?P<value>.+?)(?:\s+है)?$", r"^मैं\s+(?P<value>.+?)\s+(?:हूँ|हूं)$"],
+    "ta": [r"(?:என் பெயர்|என் பேர்|என்னுடைய பெயர்)\s+(?P<value>.+)$"],
+}
+
+_ADDRESS_PATTERNS = {
+    "en": [
+        r"\b(?:i am from|i'm from|im from|from|live in|live at|living in|living at|"
+        r"staying in|staying at|stay in|stay at|my address is|address is)\s+(?P<value>.+)$",
+    ],
+    "hi": [
+        r"(?:मेरा पता|पता)\s+(?P<value>.+?)(?:\s+है)?$",
+        r"^(?:मैं\s+)?(?P<value>.+?)\s+(?:से हूँ|से हूं|में रहता हूँ|में रहता हूं|"
+        r"में रहती हूँ|में रहती हूं|में रहते हैं)$",
+    ],
+    "ta": [
+        r"(?:என் முகவரி|முகவரி)\s+(?P<value>.+)$",
+        r"^(?:நான்\s+)?(?P<value>.+?)\s+(?:வசிக்கிறேன்|இருக்கிறேன்|இருக்கேன்|தங்கியிருக்கிறேன்)$",
+    ],
+}
+
+_AGE_CUES = {
+    "en": r"\b(?:years?|yrs?|age|aged)\b",
+    "hi": r"साल|वर्ष|उम्र|आयु",
+    "ta": r"வயது|வயசு",
+}
+
+_PAY_CUES = {
+    "en": r"\b(?:rupees?|rs|inr|salary|pay|wages?|per month|monthly)\b|₹",
+    "hi": r"रुपये|रुपए|रुपया|वेतन|तनख्वाह|सैलरी|पगार|महीना|₹",
+    "ta": r"ரூபாய்|சம்பளம்|மாதம்|₹",
+}
+
+_NAME_RE = {lang: [re.compile(p, re.IGNORECASE) for p in pats] for lang, pats in _NAME_PATTERNS.items()}
+_ADDRESS_RE = {lang: [re.compile(p, re.IGNORECASE) for p in pats] for lang, pats in _ADDRESS_PATTERNS.items()}
+_AGE_CUE_RE = {lang: re.compile(p, re.IGNORECASE) for lang, p in _AGE_CUES.items()}
+_PAY_CUE_RE = {lang: re.compile(p, re.IGNORECASE) for lang, p in _PAY_CUES.items()}
+
+
+def _match_value(patterns, clause: str):
+    """Return the "value" group of the first matching cue pattern."""
+    return _match_cue(patterns, clause)[0]
+
+
+def _match_cue(patterns, clause: str):
+    """(value, text before the cue) for the first matching cue pattern, or (None, "")."""
+    for pattern in patterns:
+        match = pattern.search(clause)
+        if match and match.group("value").strip():
+            return match.group("value").strip(), clause[:match.start()].strip()
+    return None, ""
+
+
+def _is_bare_number(clause: str, language: str) -> bool:
+    """True when every token in the clause is part of a number."""
+    tokens = tokenize(clause, language)
+    return bool(tokens) and all(kind in (NUMBER, MULTIPLIER) for _, kind, _ in tokens)
+
+
+def valid_age(age) -> bool:
+    """Ages the IVR accepts for applicants."""
+    return age is not None and 18 <= age < 120
+
+
+def extract_slots(text: str, language: str = "en", expected_field: str = None):
+    """
+    Find every field the caller mentioned in one utterance.
+
+    Args:
+        text: Transcribed utterance
+        language: Session language ("en", "hi", "ta")
+        expected_field: Field the caller was just asked for; bare numbers are
+            attributed to it when it is "age" or "pay", and left in the
+            residual otherwise
+
+    Returns:
+        (slots, residual) where slots maps field name to a normalised value
+        (digit string for number, numeric string for age and pay) and residual
+        is the text of clauses that matched no cue.
+    """
+    if language not in _NAME_RE:
+        language = "en"
+
+    slots = {}
+    residual = []
+    in_address = False
+
+    for clause in _CLAUSE_SPLIT_RE.split(text.strip()):
+        clause = clause.strip()
+        if not clause:
+            continue
+        continues_address = in_address
+        in_address = False
+
+        digits = parse_digits(clause, language)
+        if len(digits) >= 10 and "number" not in slots:
+            slots["number"] = digits
+            continue
+
+        if _AGE_CUE_RE[language].search(clause):
+            age = parse_number(clause, language)
+            if valid_age(age) and "age" not in slots:
+                slots["age"] = str(age)
+                continue
+
+        if _PAY_CUE_RE[language].search(clause):
+            pay = parse_number(clause, language)
+            if pay and "pay" not in slots:
+                slots["pay"] = str(pay)
+                continue
+
+        address, before = _match_cue(_ADDRESS_RE[language], clause)
+        if address and "address" not in slots:
+            slots["address"] = address
+            in_address = True
+            if before:
+                # "Ram from Madurai": the words before the cue are another answer
+                name = _match_value(_NAME_RE[language], before)
+                if name and "name" not in slots and parse_number(name, language) is None:
+                    slots["name"] = name
+                else:
+                    residual.append(before)
+            continue
+
+        name = _match_value(_NAME_RE[language], clause)
+        if name and "name" not in slots and parse_number(name, language) is None:
+            slots["name"] = name
+            continue
+
+        if _is_bare_number(clause, language) and expected_field in ("age", "pay"):
+            # A bare number can only be read as the answer to the question asked;
+            # a short phone number is not a salary
+            value = parse_number(clause, language)
+            field = expected_field
+            if field not in slots and value and (field != "age" or valid_age(value)):
+                slots[field] = str(value)
+                continue
+
+        if continues_address:
+            # "from 12 MG Road, Chennai": later clauses extend the address
+            slots["address"] = f"{slots['address']}, {clause}"
+            in_address = True
+            continue
+
+        residual.append(clause)
+
+    return slots, ", ".join(residual)
@@ -0,0 +1,106 @@
+"""Test call admission, stage queueing and adaptive limits."""
+
+import asyncio
+import time
+
+import admission
+from admission import AdaptiveLimiter, OverCapacity
+
+
+def test_limiter_queues_then_refuses():
+    async def scenario():
+        limiter = AdaptiveLimiter("asr", limit=2, max_limit=2, max_queue=2, queue_timeout=5)
+        results = await asyncio.gather(
+            *(limiter.run(time.sleep, 0.05) for _ in range(5)), return_exceptions=True
+        )
+        return limiter, results
+
+    limiter, results = asyncio.run(scenario())
+    # Two run at once, two wait their turn, the fifth is refused straight away
+    assert [isinstance(r, OverCapacity) for r in results].count(True) == 1
+    assert limiter.rejected == 1
+    assert limiter.in_flight == 0 and limiter.queued == 0
+
+
+def test_limiter_queue_timeout():
+    async def scenario():
+        limiter = AdaptiveLimiter("tts", limit=1, max_limit=1, max_queue=5, queue_timeout=0.01)
+        return await asyncio.gather(
+            limiter.run(time.sleep, 0.1), limiter.run(time.sleep, 0), return_exceptions=True
+        )
+
+    first, second = asyncio.run(scenario())
+    assert first is None
+    assert isinstance(second, OverCapacity) and second.stage == "tts"
+
+
+def test_limit_follows_latency():
+    limiter = AdaptiveLimiter("asr", limit=10, max_limit=20, target_latency=1.0)
+    limiter.in_flight = 10
+    for _ in range(30):
+        limiter._record(0.2)
+    assert int(limiter.limit) > 10
+
+    grown = limiter.limit
+    limiter._record(5.0)
+    assert limiter.limit == grown * 0.75
+
+
+def test_admit_call_session_cap():
+    started = []
+    admission.admit_call(lambda: admission.MAX_ACTIVE_SESSIONS - 1, lambda: started.append(1))
+    assert started == [1]
+    try:
+        admission.admit_call(lambda: admission.MAX_ACTIVE_SESSIONS, lambda: started.append(2))
+        assert False, "call should have been refused"
+    except OverCapacity as e:
+        assert e.stage == "sessions" and e.retry_after == admission.CALL_BACK_AFTER_S
+    assert started == [1]
+    assert admission.state(admission.MAX_ACTIVE_SESSIONS)["accepting_calls"] is False
+
+
+def test_idle_sessions_are_not_active():
+    from session_store import MemorySessionStore
+
+    store = MemorySessionStore()
+    store.save("talking", {})
+    store.save("abandoned", {})
+    # The browser was closed mid-call: no turn since, though the session hasn't expired
+    session, _ = store._sessions["abandoned"]
+    store._sessions["abandoned"] = (session, time.time() - admission.SESSION_IDLE_S - 1)
+    assert store.count() == 2
+    assert admission.active_sessions(store) == 1
+
+
+def test_cancelled_render_releases_waiters():
+    import app
+
+    def slow_render(text, language):
+        time.sleep(0.2)
+        return "/audio/prompt.mp3"
+
+    async def scenario():
+        first = asyncio.create_task(app.synthesize_prompt("Hello", "en"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(app.synthesize_prompt("Hello", "en"))
+        await asyncio.sleep(0.01)
+        first.cancel()  # The first caller hangs up
+        return await asyncio.wait_for(second, timeout=1.0)
+
+    original = app.prompt_audio_url, app.cached_prompt
+    app.prompt_audio_url, app.cached_prompt = slow_render, lambda text, language: None
+    try:
+        assert asyncio.run(scenario()) is None  # Replies without audio instead of hanging
+        assert app._rendering == {}
+    finally:
+        app.prompt_audio_url, app.cached_prompt = original
+
+
+if __name__ == "__main__":
+    test_limiter_queues_then_refuses()
+    test_limiter_queue_timeout()
+    test_limit_follows_latency()
+    test_admit_call_session_cap()
+    test_idle_sessions_are_not_active()
+    test_cancelled_render_releases_waiters()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,88 @@
+"""Test ranking and incremental sync of the applicant index."""
+
+import random
+import time
+
+from applicant_index import ApplicantIndex, location_query
+
+ROWS = [
+    {"id": 1, "address": "12 MG Road, Chennai", "pay": "25000", "age": 32},
+    {"id": 2, "address": "Anna Nagar, Chennai", "pay": "40000", "age": 45},
+    {"id": 3, "address": "Koramangala, Bengaluru", "pay": "24000", "age": 28},
+    {"id": 4, "address": "Andheri, Mumbai", "pay": "60000", "age": 38},
+    {"id": 5, "address": "चेन्नई", "pay": None, "age": None},
+]
+
+
+def _index(rows=ROWS):
+    index = ApplicantIndex()
+    for row in rows:
+        index.add(row)
+    return index
+
+
+def test_location_query_quotes_words():
+    assert location_query("Anna Nagar, Chennai") == '"Anna" OR "Nagar" OR "Chennai"'
+    assert location_query('"') is None
+    assert location_query("") is None
+
+
+def test_ranks_by_location_and_wage():
+    index = _index()
+    # Chennai applicants nearest the wage first, then everyone else nearest the wage, no pay last
+    assert index.top("Chennai", 25000, k=5) == [1, 2, 3, 4, 5]
+    assert index.top("Chennai", 25000, k=2) == [1, 2]
+    assert index.top("Bengaluru", 25000, k=2) == [3, 1]
+    assert index.top("चेन्नई", None, k=1) == [5]
+
+
+def test_without_profile_newest_first():
+    assert _index().top("", None, k=3) == [5, 4, 3]
+
+
+def test_age_filter_and_replace():
+    index = _index()
+    assert index.top("Chennai", 25000, k=5, max_age=40) == [1, 3, 4]
+    # A row saved again (same id) replaces the old version
+    index.add({"id": 4, "address": "T Nagar, Chennai", "pay": "25000", "age": 38})
+    assert index.top("Chennai", 25000, k=2, max_age=40) == [4, 1]
+    assert index.count() == 5
+
+
+def test_sync_pulls_new_rows_by_id():
+    index = _index(ROWS[:2])
+    requested = []
+
+    def fetch_since(last_id, limit):
+        requested.append(last_id)
+        return [row for row in ROWS if row["id"] > last_id][:limit]
+
+    index.sync(fetch_since, force=True)
+    assert requested == [2] and index.count() == 5
+    index.sync(fetch_since)  # Within the sync interval: no query
+    assert requested == [2]
+
+
+def test_top_k_is_fast():
+    random.seed(7)
+    cities = ["Chennai", "Bengaluru", "Mumbai", "Delhi", "Pune"]
+    index = _index([
+        {"id": i, "address": f"{i} Main Road, {random.choice(cities)}",
+         "pay": str(random.randrange(10000, 80000)), "age": random.randrange(18, 65)}
+        for i in range(1, 20001)
+    ])
+    started = time.perf_counter()
+    top = index.top("Pune", 30000, k=20)
+    elapsed = time.perf_counter() - started
+    assert len(top) == 20
+    assert elapsed < 0.1, f"top-20 of 20k took {elapsed * 1000:.0f} ms"
+
+
+if __name__ == "__main__":
+    test_location_query_quotes_words()
+    test_ranks_by_location_and_wage()
+    test_without_profile_newest_first()
+    test_age_filter_and_replace()
+    test_sync_pulls_new_rows_by_id()
+    test_top_k_is_fast()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,47 @@
+"""Test when a confident recognizer result skips the confirmation turn."""
+
+from ivr_handler import QUESTIONS, get_initial_question, get_session, process_turn, reset_session
+from language_config import CONFIDENCE_THRESHOLDS
+
+NAMES = {"en": "Ravi Kumar", "hi": "रवि कुमार", "ta": "ரவி குமார்"}
+
+
+def _answer_name(language: str, confidence: float):
+    session_id = f"confidence-{language}-{confidence}"
+    get_initial_question(session_id, language, synthesize=False)
+    result = process_turn(session_id, NAMES[language], confidence=confidence, synthesize=False)
+    session = get_session(session_id)
+    reset_session(session_id)
+    return result, session
+
+
+def test_skips_confirmation_above_threshold():
+    for language, thresholds in CONFIDENCE_THRESHOLDS.items():
+        result, session = _answer_name(language, thresholds["name"] + 0.01)
+        assert result["assistant_text"].endswith(QUESTIONS[language]["age"]), language
+        assert result["fields"]["name"] == NAMES[language]
+        assert not session["awaiting_confirmation"]
+
+
+def test_confirms_below_threshold():
+    for language, thresholds in CONFIDENCE_THRESHOLDS.items():
+        result, session = _answer_name(language, thresholds["name"] - 0.01)
+        assert session["awaiting_confirmation"], language
+        assert NAMES[language] in result["assistant_text"]
+        assert session["current_field"] == "name"
+
+
+def test_volunteered_fields_are_always_confirmed():
+    get_initial_question("confidence-multi", "en", synthesize=False)
+    result = process_turn("confidence-multi", "I'm Ravi, from Chennai", confidence=0.99, synthesize=False)
+    session = get_session("confidence-multi")
+    assert session["awaiting_confirmation"] and session["pending_fields"] == ["name", "address"]
+    assert "Chennai" in result["assistant_text"]
+    reset_session("confidence-multi")
+
+
+if __name__ == "__main__":
+    test_skips_confirmation_above_threshold()
+    test_confirms_below_threshold()
+    test_volunteered_fields_are_always_confirmed()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,205 @@
+"""Test phone normalisation and merging of repeat applications."""
+
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+import database
+from applicant_index import ApplicantIndex
+from dedup import merge_record, normalize_phone, same_applicant
+
+
+class FakeTable:
+    """Just enough of the Supabase query builder for database.py's calls queries."""
+
+    def __init__(self, rows, lost_replies):
+        self.rows = rows
+        self.lost_replies = lost_replies
+        self._filters = []
+        self._insert = self._update = None
+        self._conflict = None
+        self._limit = None
+        self._order = None
+
+    def insert(self, data):
+        self._insert = data
+        return self
+
+    def upsert(self, data, on_conflict):
+        self._insert, self._conflict = data, on_conflict
+        return self
+
+    def update(self, values):
+        self._update = values
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(lambda row: row[column] >= value)
+        return self
+
+    def in_(self, column, values):
+        self._filters.append(lambda row: row[column] in values)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def execute(self):
+        class Response:
+            pass
+
+        response = Response()
+        if self._insert is not None:
+            key = self._conflict
+            for row in self.rows:
+                if key and row.get(key) == self._insert[key]:
+                    row.update(self._insert)
+                    break
+            else:
+                row = dict(self._insert, id=len(self.rows) + 1,
+                           created_at=datetime.now(timezone.utc).isoformat())
+                self.rows.append(row)
+            response.data = [dict(row)]
+            if self.lost_replies:
+                # Written, but the reply never arrives
+                self.lost_replies.pop()
+                raise httpx.ReadTimeout("timed out")
+            return response
+        matched = [row for row in self.rows if all(f(row) for f in self._filters)]
+        if self._order:
+            column, desc = self._order
+            matched.sort(key=lambda row: row[column], reverse=desc)
+        if self._update is not None:
+            for row in matched:
+                row.update(self._update)
+        response.data = [dict(row) for row in matched][:self._limit]
+        return response
+
+
+class FakeClient:
+    def __init__(self):
+        self.rows = []
+        self.lost_replies = []
+
+    def table(self, name):
+        assert name == "calls"
+        return FakeTable(self.rows, self.lost_replies)
+
+
+def _with_fake_database(test):
+    def run():
+        client, index = FakeClient(), ApplicantIndex()
+        original = database._client, database.APPLICANT_INDEX
+        database._client, database.APPLICANT_INDEX = client, index
+        try:
+            test(client)
+        finally:
+            database._client, database.APPLICANT_INDEX = original
+    run.__name__ = test.__name__
+    return run
+
+
+def test_normalize_phone():
+    assert normalize_phone("98412 34567") == "9841234567"
+    assert normalize_phone("+91 98412-34567") == "9841234567"
+    assert normalize_phone("09841234567") == "9841234567"
+    assert normalize_phone("12345") is None
+    assert normalize_phone(None) is None
+
+
+def test_merge_policy():
+    existing = {"id": 1, "name": "Ravi", "address": "Chennai", "pay": "20000", "contact_status": "Contacted"}
+    new = {"name": "Ravi Kumar", "address": "", "pay": "20000", "contact_status": "Pending", "age": "32"}
+    # Newer non-empty values win; blanks and the employer's status don't overwrite
+    assert merge_record(existing, new) == {"name": "Ravi Kumar", "age": "32"}
+
+
+def test_same_applicant():
+    assert same_applicant({"name": "Ravi"}, {"name": "ravi kumar."})
+    assert same_applicant({"name": "Ravi Kumar"}, {"name": "Ravi"})
+    assert same_applicant({"name": None}, {"name": "Priya"})
+    assert not same_applicant({"name": "Ravi Kumar"}, {"name": "Priya"})
+    assert not same_applicant({"name": "Ravi Kumar"}, {"name": "Ravi Shankar"})
+
+
+@_with_fake_database
+def test_repeat_call_updates_record(client):
+    database.insert_record(name="Ravi", number="9841234567", address="Chennai", pay="20000", age="32")
+    database.update_contact_status(1, "Contacted")
+    rows = database.insert_record(name="Ravi Kumar", number="+91 98412 34567", address=None, pay="25000", age="32")
+
+    assert len(client.rows) == 1
+    assert rows[0]["name"] == "Ravi Kumar" and rows[0]["pay"] == "25000"
+    assert rows[0]["address"] == "Chennai" and rows[0]["contact_status"] == "Contacted"
+    assert rows[0]["number"] == "9841234567"
+
+
+@_with_fake_database
+def test_new_record_outside_window(client):
+    database.insert_record(name="Ravi", number="9841234567", pay="20000")
+    database.insert_record(name="Priya", number="9840000000", pay="20000")
+    # The first application is older than the window
+    saved_at = datetime.now(timezone.utc) - timedelta(seconds=database.DEDUP_WINDOW_S + 1)
+    client.rows[0]["created_at"] = saved_at.isoformat()
+    database.insert_record(name="Ravi", number="9841234567", pay="30000")
+    assert [row["name"] for row in client.rows] == ["Ravi", "Priya", "Ravi"]
+
+
+@_with_fake_database
+def test_shared_phone_keeps_both_applicants(client):
+    database.insert_record(name="Ravi Kumar", number="9841234567", pay="20000")
+    database.insert_record(name="Priya", number="98412 34567", pay="18000")
+    assert [row["name"] for row in client.rows] == ["Ravi Kumar", "Priya"]
+
+    # Ravi calls again: his own row is updated, not the newer one of Priya
+    database.insert_record(name="Ravi Kumar", number="+91 98412 34567", pay="25000")
+    assert [(row["name"], row["pay"]) for row in client.rows] == [("Ravi Kumar", "25000"), ("Priya", "18000")]
+
+
+@_with_fake_database
+def test_recognises_record_from_other_worker(client):
+    # Saved a moment ago by another worker, which this worker's index has not seen
+    client.rows.append({"id": 1, "name": "Ravi", "number": "9841234567", "pay": "20000",
+                        "contact_status": "Pending", "created_at": datetime.now(timezone.utc).isoformat()})
+    database.insert_record(name="Ravi", number="98412 34567", pay="22000")
+    assert len(client.rows) == 1 and client.rows[0]["pay"] == "22000"
+
+
+
+@_with_fake_database
+def test_retried_save_is_written_once(client):
+    client.lost_replies.append(True)
+    rows = database.insert_record(name="Ravi", number="9841234567", pay="20000", call_id="token-1")
+    assert len(client.rows) == 1 and rows[0]["call_id"] == "token-1"
+
+    # A new call merging into the row keeps the call that created it
+    database.insert_record(name="Ravi", number="9841234567", pay="25000", call_id="token-2")
+    assert len(client.rows) == 1
+    assert client.rows[0]["call_id"] == "token-1" and client.rows[0]["pay"] == "25000"
+
+if __name__ == "__main__":
+    test_normalize_phone()
+    test_merge_policy()
+    test_same_applicant()
+    test_repeat_call_updates_record()
+    test_new_record_outside_window()
+    test_shared_phone_keeps_both_applicants()
+    test_recognises_record_from_other_worker()
+    test_retried_save_is_written_once()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,77 @@
+"""Test that importing the app stays cheap and /ready tracks warm-up."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Seconds our own modules may add on top of FastAPI and NumPy
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "0.5"))
+
+# SDKs that must only load when first used
+LAZY_MODULES = ["supabase", "google.cloud.speech_v1p1beta1", "gtts", "openai"]
+
+PROBE = """
+import sys, time
+import fastapi, numpy, starlette.concurrency
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+print(",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def test_import_budget():
+    # Fresh interpreter without credentials, like a cold container
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("SUPABASE_", "GOOGLE_", "OPENAI_"))}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(lazy=LAZY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    elapsed, loaded = float(output[0]), output[1] if len(output) > 1 else ""
+    assert loaded == "", f"imported eagerly: {loaded}"
+    assert elapsed < IMPORT_BUDGET_S, f"import app took {elapsed:.2f}s"
+
+
+def test_ready_after_warm_up():
+    from fastapi.testclient import TestClient
+    import app
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("no credentials")
+
+    def wait_for(done):
+        for _ in range(200):
+            if done():
+                return
+            time.sleep(0.01)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(app, "WARM_UP", {"fast": lambda: None, "flaky": flaky})
+        patch.setattr(app, "READINESS", {"fast": "pending", "flaky": "pending"})
+        patch.setattr(app, "WARM_UP_RETRY_S", 0.2)
+
+        with TestClient(app.app) as client:
+            assert client.get("/health").status_code == 200
+            wait_for(lambda: "pending" not in app.READINESS.values())
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["dependencies"] == {"fast": "ok", "flaky": "error: no credentials"}
+
+            # Retried in the background until it loads
+            wait_for(lambda: app.READINESS["flaky"] == "ok")
+            assert client.get("/ready").status_code == 200
+            assert len(attempts) == 3
+
+
+if __name__ == "__main__":
+    test_import_budget()
+    test_ready_after_warm_up()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,57 @@
+"""Test log redaction, debug sampling and JSON output."""
+
+import io
+import json
+import logging
+
+from logging_config import setup_logging, shutdown_logging, parse_levels, redact
+
+
+def capture(**options):
+    stream = io.StringIO()
+    setup_logging(stream=stream, **options)
+    return stream
+
+
+def test_redaction():
+    assert redact("9841234567") == "********67"
+    assert redact("Ravi Kumar") == "R***"
+
+    stream = capture(level="DEBUG", log_format="json")
+    logging.getLogger("ivr_handler").debug("Turn processed", extra={
+        "session_id": "s1",
+        "transcript": "my name is Ravi",
+        "fields": {"name": "Ravi", "age": "32", "number": "9841234567", "address": "Chennai"},
+    })
+    logging.getLogger("app").info("Caller 98412 34567 connected")
+    shutdown_logging()
+
+    turn, caller = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert turn["session_id"] == "s1"
+    assert turn["transcript"] == "m***"
+    assert turn["fields"] == {"name": "R***", "age": "32", "number": "********67", "address": "C***"}
+    assert caller["message"] == "Caller ********67 connected"
+
+
+def test_levels_and_sampling():
+    assert parse_levels("ivr_handler=debug, transcribe_module=WARNING") == {
+        "ivr_handler": "DEBUG", "transcribe_module": "WARNING",
+    }
+
+    stream = capture(level="INFO", module_levels={"chatty": "DEBUG"},
+                     log_format="plain", debug_sample_rate=0.0)
+    logging.getLogger("chatty").debug("sampled out")
+    logging.getLogger("quiet").debug("below level")
+    logging.getLogger("quiet").warning("kept")
+    shutdown_logging()
+    logging.getLogger("chatty").setLevel(logging.NOTSET)
+
+    output = stream.getvalue()
+    assert "kept" in output
+    assert "sampled out" not in output and "below level" not in output
+
+
+if __name__ == "__main__":
+    test_redaction()
+    test_levels_and_sampling()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,248 @@
+"""Test the Twilio media stream endpoint with a local fake media-stream client."""
+
+import base64
+import json
+import wave
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import media_stream
+from language_config import SERVICE_ERROR_MESSAGES
+from media_stream import MediaStreamCall, mulaw_decode, mulaw_encode, FRAME_SAMPLES
+from resilience import DatabaseError
+from transcribe_module import TranscriptionResult
+from vad import VoiceActivityDetector, SPEECH_START, SPEECH_END
+
+
+def test_mulaw_round_trip():
+    samples = np.linspace(-32000, 32000, 1000).astype(np.int16)
+    decoded = mulaw_decode(mulaw_encode(samples)).astype(np.int32)
+    # μ-law keeps roughly 8 bits of precision relative to the magnitude
+    assert np.all(np.abs(decoded - samples) <= np.abs(samples) / 16 + 8)
+
+
+def _frames(seconds: float, amplitude: int):
+    """20 ms μ-law frames of a 440 Hz tone (or silence when amplitude is 0)."""
+    t = np.arange(int(seconds * 8000)) / 8000
+    audio = mulaw_encode((amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16))
+    for offset in range(0, len(audio), FRAME_SAMPLES):
+        yield base64.b64encode(audio[offset:offset + FRAME_SAMPLES]).decode("ascii")
+
+
+def _await_prompt(ws):
+    """Read outbound audio until the prompt's mark, then acknowledge playback."""
+    media = 0
+    while True:
+        message = ws.receive_json()
+        if message["event"] == "media":
+            media += 1
+        elif message["event"] == "mark":
+            ws.send_json({"event": "mark", "streamSid": "MZ1", "mark": message["mark"]})
+            return media
+
+
+def _speak(ws, seconds: float = 1.0):
+    """Send a tone followed by a second of silence, like one caller answer."""
+    for payload in list(_frames(seconds, 8000)) + list(_frames(1.0, 0)):
+        ws.send_text(json.dumps({
+            "event": "media", "streamSid": "MZ1",
+            "media": {"track": "inbound", "payload": payload},
+        }))
+
+
+def _fake_call(answers, saved, save_record=None, spoken=None):
+    """
+    App with the media stream endpoint wired to fake ASR, TTS and database.
+
+    An exception among the answers is raised by the fake ASR instead.
+    """
+    answers = iter(answers)
+
+    def fake_transcribe(path, language_code, sample_rate_hertz=48000):
+        with wave.open(path, "rb") as wav_file:
+            assert wav_file.getframerate() == 8000
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return TranscriptionResult(answer, confidence=0.99)
+
+    def fake_synthesize(text):
+        if spoken is not None:
+            spoken.append(text)
+        return np.zeros(2400, dtype="<i2").tobytes()  # 0.1 s at 24 kHz
+
+    def save_fields(fields, call_id):
+        saved.append(fields)
+
+    app = FastAPI()
+
+    @app.websocket("/media-stream")
+    async def media_stream(websocket: WebSocket):
+        await websocket.accept()
+        await MediaStreamCall(websocket, fake_transcribe, fake_synthesize, save_record or save_fields).run()
+
+    return TestClient(app).websocket_connect("/media-stream")
+
+
+def _start(ws, call_sid: str):
+    ws.send_json({"event": "connected", "protocol": "Call", "version": "1.0.0"})
+    ws.send_json({
+        "event": "start",
+        "streamSid": "MZ1",
+        "start": {"streamSid": "MZ1", "callSid": call_sid,
+                  "customParameters": {"language": "en"}},
+    })
+
+
+def test_phone_call_completes():
+    saved = []
+    with _fake_call(["I'm Ravi, 32 years old, from Chennai", "yes", "9841234567", "25000"], saved) as ws:
+        _start(ws, "CA1")
+        assert _await_prompt(ws) > 0  # Greeting
+
+        for _ in range(4):
+            _speak(ws)
+            _await_prompt(ws)
+
+    assert saved == [{"name": "Ravi", "age": "32", "number": "9841234567",
+                      "address": "Chennai", "pay": "25000"}]
+
+
+def test_barge_in_clears_prompt():
+    saved = []
+    with _fake_call(["Ravi"], saved) as ws:
+        _start(ws, "CA2")
+        message = ws.receive_json()
+        while message["event"] != "mark":
+            message = ws.receive_json()
+
+        # Talk over the greeting before Twilio reports it finished playing
+        _speak(ws)
+        assert ws.receive_json()["event"] == "clear"
+        assert _await_prompt(ws) > 0  # Confirmation of the name
+
+
+def test_short_noise_is_not_speech():
+    def tone(seconds):
+        return np.concatenate([mulaw_decode(base64.b64decode(frame)) for frame in _frames(seconds, 8000)])
+
+    vad = VoiceActivityDetector(sample_rate=8000)
+    silence = np.zeros(8000, dtype=np.int16)
+    assert vad.feed(tone(0.12)) + vad.feed(silence) == []  # A cough
+
+    events = [event for event, _ in vad.feed(tone(0.5)) + vad.feed(silence)]
+    assert events == [SPEECH_START, SPEECH_END]
+
+
+def test_empty_transcript_repeats_question():
+    spoken = []
+    with _fake_call(["", "Ravi"], [], spoken=spoken) as ws:
+        _start(ws, "CA4")
+        _await_prompt(ws)
+
+        _speak(ws)
+        _await_prompt(ws)
+        assert spoken[-1].startswith("Sorry, I couldn't hear that properly.")
+
+        _speak(ws)
+        _await_prompt(ws)
+        assert spoken[-1].endswith("how old are you?")  # Ravi was accepted as the name
+
+
+def test_failed_turns_are_answered():
+    spoken = []
+
+    def failing_save(fields, call_id):
+        raise DatabaseError("supabase", "connection reset")
+
+    answers = [RuntimeError("unexpected"), "I'm Ravi, 32 years old, from Chennai", "yes", "9841234567", "25000"]
+    with _fake_call(answers, [], save_record=failing_save, spoken=spoken) as ws:
+        _start(ws, "CA3")
+        _await_prompt(ws)
+
+        # A bug in the turn is logged and answered, and the call keeps listening
+        _speak(ws)
+        _await_prompt(ws)
+        assert spoken[-1] == SERVICE_ERROR_MESSAGES["en"]["went_wrong"]
+
+        for _ in range(4):
+            _speak(ws)
+            _await_prompt(ws)
+    # The caller is told the application was not saved
+    assert spoken[-1] == SERVICE_ERROR_MESSAGES["en"]["not_saved"]
+
+
+def test_session_store_failure_is_answered():
+    spoken = []
+    get_session = media_stream.get_session
+
+    def flaky_get_session(session_id):
+        if len(spoken) == 1:  # Only the first turn after the greeting
+            raise DatabaseError("supabase", "connection reset")
+        return get_session(session_id)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(media_stream, "get_session", flaky_get_session)
+        with _fake_call(["Ravi"], [], spoken=spoken) as ws:
+            _start(ws, "CA5")
+            _await_prompt(ws)
+
+            _speak(ws)
+            _await_prompt(ws)
+            assert spoken[-1] == SERVICE_ERROR_MESSAGES["en"]["went_wrong"]
+
+            # The call carries on with the next utterance
+            _speak(ws)
+            _await_prompt(ws)
+            assert spoken[-1].endswith("how old are you?")
+
+
+def test_calls_must_come_from_twilio():
+    import app
+    import twilio_auth
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(twilio_auth, "TWILIO_AUTH_TOKEN", "secret")
+        client = TestClient(app.app)
+        url = "http://testserver/twilio/voice?language=en"
+        form = {"CallSid": "CA5", "From": "+919840000000"}
+
+        assert client.post(url, data=form).status_code == 403
+        forged = {"X-Twilio-Signature": twilio_auth.request_signature(url, form, "guess")}
+        assert client.post(url, data=form, headers=forged).status_code == 403
+
+        signed = {"X-Twilio-Signature": twilio_auth.request_signature(url, form, "secret")}
+        response = client.post(url, data=form, headers=signed)
+        assert response.status_code == 200
+        token = twilio_auth.stream_token("CA5", "+919840000000", "en")
+        assert f'<Parameter name="token" value="{token}"/>' in response.text
+
+        # A stream claiming someone else's number is closed before any greeting
+        assert twilio_auth.valid_stream("CA5", "+919840000000", "en", token)
+        assert not twilio_auth.valid_stream("CA5", "+919841234567", "en", token)
+        with client.websocket_connect("/media-stream") as ws:
+            ws.send_json({
+                "event": "start", "streamSid": "MZ5",
+                "start": {"streamSid": "MZ5", "callSid": "CA5",
+                          "customParameters": {"language": "en", "caller": "+919841234567", "token": token}},
+            })
+            try:
+                ws.receive_json()
+                assert False, "a forged stream must not be answered"
+            except WebSocketDisconnect as e:
+                assert e.code == 1008
+
+
+if __name__ == "__main__":
+    test_mulaw_round_trip()
+    test_phone_call_completes()
+    test_barge_in_clears_prompt()
+    test_short_noise_is_not_speech()
+    test_empty_transcript_repeats_question()
+    test_failed_turns_are_answered()
+    test_calls_must_come_from_twilio()
+    print("✅ ALL TESTS PASSED!")
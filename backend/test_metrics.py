@@ -0,0 +1,27 @@
+"""Test stage spans and the Prometheus text output."""
+
+import metrics
+from metrics import span, turn_labels, record_cache_lookup
+
+
+def test_span_records_turn_labels():
+    with turn_labels("ta", "age"):
+        with span("asr"):
+            pass
+    output = metrics.render()
+    assert 'ivr_stage_duration_seconds_count{stage="asr",language="ta",field="age"} 1' in output
+    assert 'ivr_stage_duration_seconds_bucket{stage="asr",language="ta",field="age",le="+Inf"} 1' in output
+
+
+def test_cache_hit_ratio():
+    for hit in (True, True, True, False):
+        record_cache_lookup("test_cache", hit)
+    output = metrics.render()
+    assert 'ivr_cache_lookups_total{cache="test_cache",result="hit"} 3' in output
+    assert 'ivr_cache_hit_ratio{cache="test_cache"} 0.75' in output
+
+
+if __name__ == "__main__":
+    test_span_records_turn_labels()
+    test_cache_hit_ratio()
+    print("✅ ALL TESTS PASSED!")
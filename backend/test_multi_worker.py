@@ -0,0 +1,104 @@
+"""Test that calls complete when every turn goes to a different worker.
+
+Starts several API processes (with the fake ASR, TTS and database from
+load_test.py) sharing one SQLite session store, then sends the turns of each
+call to the workers round-robin, as a load balancer without sticky sessions
+would.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from load_test import choose_reply
+
+WORKERS = 3
+
+SERVER = """
+import sys, uvicorn, load_test
+app = load_test.install_fakes(load_test.FakeServices())
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+EXPECTED = {
+    "en": {"name": "Ravi Kumar", "age": "32", "number": "9841234567",
+           "address": "12 MG Road, Chennai", "pay": "25000"},
+    "hi": {"name": "रवि कुमार", "age": "32", "number": "9841234567",
+           "address": "चेन्नई", "pay": "25000"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_workers(count: int, env: dict):
+    ports = [free_port() for _ in range(count)]
+    processes = [
+        subprocess.Popen([sys.executable, "-c", SERVER, str(port)], env=env,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+        for port in ports
+    ]
+    deadline = time.time() + 30
+    for port in ports:
+        while True:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.1)
+    return ports, processes
+
+
+def test_round_robin_turns():
+    with tempfile.TemporaryDirectory() as shared:
+        env = dict(os.environ, SESSION_BACKEND="sqlite",
+                   SESSION_DB_PATH=os.path.join(shared, "sessions.db"), AUDIO_DIR=shared)
+        ports, processes = start_workers(WORKERS, env)
+        try:
+            turn = 0
+
+            def post(path, **kwargs):
+                nonlocal turn
+                port = ports[turn % len(ports)]
+                turn += 1
+                return httpx.post(f"http://127.0.0.1:{port}{path}", timeout=10, **kwargs).json()
+
+            for call, language in enumerate(["en", "hi", "en", "hi"]):
+                session_id = f"rr-{call}"
+                body = post("/ivr/start", data={"session_id": session_id, "language": language})
+                reply = ""
+                for _ in range(30):
+                    reply = choose_reply(body["assistant_text"], language, reply)
+                    files = {"file": ("turn.webm", reply.encode("utf-8"), "audio/webm")}
+                    body = post("/ivr", data={"session_id": session_id}, files=files)
+                    assert body["status"] == "success", body
+                    if body["finished"]:
+                        break
+                assert body["finished"], session_id
+                assert body["fields"] == EXPECTED[language]
+
+            # Audio written by one worker is served by the others
+            with open(os.path.join(shared, "prompt.mp3"), "wb") as audio_file:
+                audio_file.write(b"ID3")
+            for port in ports:
+                assert httpx.get(f"http://127.0.0.1:{port}/audio/prompt.mp3").content == b"ID3"
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    test_round_robin_turns()
+    print("✅ ALL TESTS PASSED!")
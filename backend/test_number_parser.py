@@ -0,0 +1,54 @@
+"""Test spoken-number parsing for age, phone number and pay answers."""
+
+from number_parser import parse_number, parse_digits
+
+
+def test_parse_number():
+    cases = [
+        ("32", "en", 32),
+        ("I am 32 years old", "en", 32),
+        ("twenty five thousand", "en", 25000),
+        ("two hundred and fifty", "en", 250),
+        ("1,50,000 rupees", "en", 150000),
+        ("2.5 lakh", "en", 250000),
+        ("पच्चीस हज़ार", "hi", 25000),
+        ("25 हजार रुपये", "hi", 25000),
+        ("ढाई हज़ार", "hi", 2500),
+        ("मेरी उम्र बत्तीस साल है", "hi", 32),
+        ("இருபத்தைந்து", "ta", 25),
+        ("இருபத்தி ஐந்து ஆயிரம்", "ta", 25000),
+        ("no idea", "en", None),
+        # Fractions and decimals
+        ("साढ़े बारह हज़ार", "hi", 12500),
+        ("सवा लाख", "hi", 125000),
+        ("पौने दो हज़ार", "hi", 1750),
+        ("सवा दो सौ", "hi", 225),
+        ("one point five lakh", "en", 150000),
+        ("twelve and a half thousand", "en", 12500),
+        ("half lakh", "en", 50000),
+        ("a thousand", "en", 1000),
+        ("10.000", "en", 10000),
+        ("1.50.000", "en", 150000),
+    ]
+    for text, language, expected in cases:
+        assert parse_number(text, language) == expected, text
+
+
+def test_parse_digits():
+    cases = [
+        ("9841234567", "en", "9841234567"),
+        ("my number is 98412 34567", "en", "9841234567"),
+        ("nine eight four one double two three four five six", "en", "9841223456"),
+        ("ninety eight 41 234567", "en", "9841234567"),
+        ("nine oh one", "en", "901"),
+        ("९८४१२३४५६७", "hi", "9841234567"),
+        ("ஒன்பது எட்டு நாலு", "ta", "984"),
+    ]
+    for text, language, expected in cases:
+        assert parse_digits(text, language) == expected, text
+
+
+if __name__ == "__main__":
+    test_parse_number()
+    test_parse_digits()
+    print("✅ ALL TESTS PASSED!")
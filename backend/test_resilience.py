@@ -0,0 +1,210 @@
+"""Test deadlines, circuit breakers, hedging and how failed service calls surface."""
+
+import threading
+import time
+
+from google.api_core import exceptions
+
+import resilience
+import transcribe_module
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DatabaseError, DeadlineExceeded, HedgePool, TranscriptionError, SynthesisError,
+    deadline, hedged, retrying, time_left,
+)
+
+
+def test_nested_deadlines_only_tighten():
+    assert time_left(5.0) == 5.0
+    with deadline(1.0):
+        assert 0.9 < time_left(5.0) <= 1.0
+        with deadline(10.0):
+            assert time_left(5.0) <= 1.0
+        with deadline(0.1):
+            assert time_left(5.0) <= 0.1
+    assert time_left(5.0) == 5.0
+
+
+def test_breaker_opens_then_recovers():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+
+    def fail():
+        with breaker.guard():
+            raise ConnectionError("down")
+
+    for _ in range(2):
+        try:
+            fail()
+        except ConnectionError:
+            pass
+    assert breaker.state == resilience.OPEN
+    try:
+        with breaker.guard():
+            assert False, "an open breaker must not call the service"
+    except CircuitOpenError:
+        pass
+
+    time.sleep(0.06)
+    with breaker.guard():
+        pass  # Trial call succeeds
+    assert breaker.state == resilience.CLOSED and breaker.failures == 0
+
+
+def test_hedged_call_returns_faster_copy():
+    calls = []
+
+    def call():
+        calls.append(1)
+        # The first request hangs, the hedge answers at once
+        if len(calls) == 1:
+            time.sleep(0.5)
+        return len(calls)
+
+    started = time.perf_counter()
+    assert hedged(call, hedge_after=0.05, timeout=1.0, pool=HedgePool(2)) == 2
+    assert time.perf_counter() - started < 0.3
+
+
+def test_hedge_never_waits_for_a_thread():
+    pool = HedgePool(1)
+    blocker = threading.Event()
+    pool.submit(blocker.wait)
+    try:
+        # No thread free: the call runs at once in this thread instead of queueing into a timeout
+        started = time.perf_counter()
+        assert hedged(lambda: "ok", hedge_after=0.01, timeout=0.05, pool=pool) == "ok"
+        assert time.perf_counter() - started < 0.05
+    finally:
+        blocker.set()
+
+    # One thread: the slow request is awaited without a hedge
+    pool = HedgePool(1)
+    assert hedged(lambda: time.sleep(0.1) or "slow", hedge_after=0.01, timeout=1.0, pool=pool) == "slow"
+
+
+def test_retries_stop_at_deadline():
+    attempts = []
+    with deadline(0.3):
+        try:
+            for attempt in retrying(lambda e: True, attempts=100, minimum_time=0.2):
+                with attempt:
+                    attempts.append(1)
+                    time.sleep(0.05)
+                    raise ConnectionError("flaky")
+        except ConnectionError:
+            pass
+    assert 1 <= len(attempts) < 5
+
+
+def test_transcription_failure_raises():
+    class FailingClient:
+        def recognize(self, config, audio, timeout):
+            raise exceptions.ServiceUnavailable("speech is down")
+
+    original = transcribe_module.get_speech_client
+    transcribe_module.get_speech_client = lambda: FailingClient()
+    breaker = resilience.BREAKERS["google_asr"]
+    try:
+        with deadline(1.0):
+            try:
+                transcribe_module.transcribe_audio(__file__, "en-IN")
+                assert False, "a failed transcription must not return text"
+            except TranscriptionError as e:
+                assert e.service == "google_asr"
+        assert breaker.failures == 1
+    finally:
+        transcribe_module.get_speech_client = original
+        breaker.record_success()
+
+
+def test_turn_deadline_is_not_a_service_failure():
+    class SlowClient:
+        def recognize(self, config, audio, timeout):
+            time.sleep(timeout + 0.1)
+
+    original = transcribe_module.get_speech_client
+    transcribe_module.get_speech_client = lambda: SlowClient()
+    breaker = resilience.BREAKERS["google_asr"]
+    try:
+        with deadline(0.2):
+            try:
+                transcribe_module.transcribe_audio(__file__, "en-IN")
+                assert False, "a timed out transcription must not return text"
+            except TranscriptionError:
+                pass
+        assert breaker.failures == 0
+    finally:
+        transcribe_module.get_speech_client = original
+        breaker.record_success()
+
+
+def test_failed_turn_repeats_question():
+    from fastapi.testclient import TestClient
+    import app
+    import ivr_handler
+
+    def no_speech(*args, **kwargs):
+        raise TranscriptionError("google_asr", "timed out")
+
+    def no_tts(*args, **kwargs):
+        raise SynthesisError("gtts", "timed out")
+
+    original = app.transcribe_audio, ivr_handler.render_speech
+    app.transcribe_audio, ivr_handler.render_speech = no_speech, no_tts
+    try:
+        ivr_handler.get_initial_question("resilience-1", "en", synthesize=False)
+        ivr_handler.process_turn("resilience-1", "Ravi Kumar", synthesize=False)
+        before = ivr_handler.get_session("resilience-1")
+
+        files = {"file": ("turn.webm", b"audio", "audio/webm")}
+        body = TestClient(app.app).post("/ivr", data={"session_id": "resilience-1"}, files=files).json()
+
+        assert body["status"] == "success"
+        assert body["user_text"] == "" and body["audio_url"] is None
+        assert body["assistant_text"].startswith("Sorry, I couldn't hear that properly.")
+        assert "Ravi Kumar" in body["assistant_text"]  # The pending confirmation is asked again
+        assert ivr_handler.get_session("resilience-1") == before
+    finally:
+        app.transcribe_audio, ivr_handler.render_speech = original
+        ivr_handler.reset_session("resilience-1")
+
+
+def test_deadline_exceeded_before_call():
+    with deadline(0.0):
+        try:
+            resilience.check_deadline("gtts")
+            assert False, "no time left"
+        except DeadlineExceeded as e:
+            assert e.service == "gtts"
+
+
+def test_supabase_session_store_raises_database_error():
+    import database
+    from session_store import SupabaseSessionStore
+
+    class BrokenClient:
+        def table(self, name):
+            raise ValueError("bad response")
+
+    original = database._client
+    database._client = BrokenClient()
+    try:
+        SupabaseSessionStore().get("resilience-2")
+        assert False, "the store is down"
+    except DatabaseError as e:
+        assert e.service == "supabase" and "get failed" in str(e)
+    finally:
+        database._client = original
+
+
+if __name__ == "__main__":
+    test_nested_deadlines_only_tighten()
+    test_breaker_opens_then_recovers()
+    test_hedged_call_returns_faster_copy()
+    test_hedge_never_waits_for_a_thread()
+    test_retries_stop_at_deadline()
+    test_transcription_failure_raises()
+    test_turn_deadline_is_not_a_service_failure()
+    test_failed_turn_repeats_question()
+    test_deadline_exceeded_before_call()
+    test_supabase_session_store_raises_database_error()
+    print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,101 @@
+"""Test resuming a dropped call by resume token or caller phone number."""
+
+import ivr_handler
+from ivr_handler import get_initial_question, process_turn, reset_session, get_session
+
+
+def _drop_after_two_answers(session_id: str, caller: str = None) -> str:
+    start = get_initial_question(session_id, "en", synthesize=False, caller=caller)
+    process_turn(session_id, "Ravi Kumar", confidence=0.99, synthesize=False)
+    result = process_turn(session_id, "32", confidence=0.99, synthesize=False)
+    assert result["resume_token"] == start["resume_token"]
+    reset_session(session_id)  # The line drops
+    return start["resume_token"]
+
+
+def test_resume_by_token():
+    token = _drop_after_two_answers("resume-1")
+
+    start = get_initial_question("resume-2", "en", synthesize=False, resume_token=token)
+    assert start["assistant_text"].startswith("Welcome back")
+    assert "phone number" in start["assistant_text"]
+    assert start["fields"]["name"] == "Ravi Kumar" and start["resume_token"] == token
+
+    result = process_turn("resume-2", "yes please", synthesize=False)
+    assert result["assistant_text"] == "Great, let's continue. " + ivr_handler.QUESTIONS["en"]["number"]
+    assert result["fields"]["age"] == "32"
+    assert get_session("resume-2")["current_field"] == "number"
+    reset_session("resume-2")
+
+
+def test_resume_by_caller_and_start_over():
+    _drop_after_two_answers("resume-3", caller="+91 98412 34567")
+
+    start = get_initial_question("resume-4", "en", synthesize=False, caller="09841234567")
+    assert start["assistant_text"].startswith("Welcome back")
+
+    result = process_turn("resume-4", "no", synthesize=False)
+    assert result["assistant_text"].startswith("No problem, let's start again.")
+    assert result["fields"] == {f: None for f in ivr_handler.FIELDS}
+    reset_session("resume-4")
+
+    # Starting over forgets the earlier answers
+    start = get_initial_question("resume-5", "en", synthesize=False, caller="9841234567")
+    assert start["assistant_text"] == ivr_handler.QUESTIONS["en"]["name"]
+    reset_session("resume-5")
+
+
+def test_saved_call_leaves_nothing_to_resume():
+    start = get_initial_question("resume-6", "en", synthesize=False, caller="9840000000")
+    result = None
+    for answer in ["Priya", "28", "9840000000", "Anna Nagar Chennai", "20000"]:
+        result = process_turn("resume-6", answer, confidence=0.99, synthesize=False)
+    assert result["finished"] and result["resume_token"] == start["resume_token"]
+    ivr_handler.application_saved(result["resume_token"])
+
+    again = get_initial_question("resume-7", "en", synthesize=False,
+                                 caller="9840000000", resume_token=start["resume_token"])
+    assert again["assistant_text"] == ivr_handler.QUESTIONS["en"]["name"]
+    reset_session("resume-7")
+
+
+def test_failed_save_can_be_resumed():
+    from fastapi.testclient import TestClient
+    import app
+    from resilience import DatabaseError
+    from transcribe_module import TranscriptionResult
+
+    answers = iter(["Priya", "28", "9840000001", "Anna Nagar Chennai", "20000"])
+
+    def fake_transcribe(path, language_code):
+        return TranscriptionResult(next(answers), confidence=0.99)
+
+    def failing_insert(fields, call_id):
+        raise DatabaseError("supabase", "connection reset")
+
+    original = app.transcribe_audio, app.insert_record_handler
+    app.transcribe_audio, app.insert_record_handler = fake_transcribe, failing_insert
+    try:
+        client = TestClient(app.app)
+        token = client.post("/ivr/start", data={"session_id": "resume-8", "language": "en"}).json()["resume_token"]
+        for _ in range(5):
+            files = {"file": ("turn.webm", b"audio", "audio/webm")}
+            body = client.post("/ivr", data={"session_id": "resume-8"}, files=files).json()
+        assert body["status"] == "error"
+    finally:
+        app.transcribe_audio, app.insert_record_handler = original
+
+    # Only the unsaved last answer has to be given again
+    start = get_initial_question("resume-9", "en", synthesize=False, resume_token=token)
+    assert start["assistant_text"].startswith("Welcome back")
+    assert start["fields"]["address"] == "Anna Nagar Chennai" and start["fields"]["pay"] is None
+    reset_session("resume-9")
+    ivr_handler.clear_checkpoint({"resume_token": token})
+
+
+if __name__ == "__main__":
+    test_resume_by_token()
+    test_resume_by_caller_and_start_over()
+    test_saved_call_leaves_nothing_to_resume()
+    test_failed_save_can_be_resumed()
+    print("✅ ALL TESTS PASSED!")
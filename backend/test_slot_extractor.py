@@ -0,0 +1,79 @@
+"""Test multi-field extraction from a single caller utterance."""
+
+from ivr_handler import ERROR_MESSAGES, SESSION_STORE, get_initial_question, get_session, process_turn, reset_session
+from slot_extractor import extract_slots
+
+
+def test_extract_slots():
+    cases = [
+        ("I'm Ravi, 32 years old, from Chennai", "en", "name",
+         {"name": "Ravi", "age": "32", "address": "Chennai"}),
+        ("my name is Ravi and my number is 98412 34567", "en", "name",
+         {"name": "Ravi", "number": "9841234567"}),
+        ("from 12 MG Road, Chennai", "en", "address", {"address": "12 MG Road, Chennai"}),
+        ("twenty five thousand rupees", "en", "pay", {"pay": "25000"}),
+        ("मेरा नाम रवि है, मैं बत्तीस साल का हूँ, मैं चेन्नई से हूँ", "hi", "name",
+         {"name": "रवि", "age": "32", "address": "चेन्नई"}),
+        ("என் பெயர் ரவி, வயது முப்பத்திரண்டு", "ta", "name", {"name": "ரவி", "age": "32"}),
+    ]
+    for text, language, expected_field, expected in cases:
+        slots, _ = extract_slots(text, language, expected_field)
+        assert slots == expected, text
+
+
+def test_unmatched_text_is_residual():
+    assert extract_slots("Ravi Kumar", "en", "name") == ({}, "Ravi Kumar")
+    # Pin codes inside an address answer are not mistaken for pay
+    assert extract_slots("12 MG Road, Chennai 600001", "en", "address") == (
+        {}, "12 MG Road, Chennai 600001"
+    )
+
+
+def test_text_before_address_cue_is_kept():
+    assert extract_slots("Ram from Madurai", "en", "name") == ({"address": "Madurai"}, "Ram")
+    assert extract_slots("I'm Ravi from Chennai", "en", "name") == ({"address": "Chennai", "name": "Ravi"}, "")
+
+    get_initial_question("slots-3", "en", synthesize=False)
+    result = process_turn("slots-3", "Ram from Madurai", confidence=0.99, synthesize=False)
+    assert result["fields"]["name"] == "Ram" and result["fields"]["address"] == "Madurai"
+    reset_session("slots-3")
+
+
+def test_short_phone_number_is_not_pay():
+    assert extract_slots("9841 2345", "en", "number") == ({}, "9841 2345")
+    assert extract_slots("32", "en", "name") == ({}, "32")
+
+    get_initial_question("slots-2", "en", synthesize=False)
+    for answer in ["Ravi Kumar", "32"]:
+        process_turn("slots-2", answer, confidence=0.99, synthesize=False)
+    result = process_turn("slots-2", "9841 2345", confidence=0.95, synthesize=False)
+    assert result["assistant_text"] == ERROR_MESSAGES["en"]["number"]
+    assert result["fields"]["pay"] is None and result["fields"]["number"] is None
+    reset_session("slots-2")
+
+
+def test_cue_for_answered_field_is_direct_answer():
+    get_initial_question("slots-1", "en", synthesize=False)
+    for answer in ["Ravi Kumar", "32", "9841234567"]:
+        process_turn("slots-1", answer, confidence=0.99, synthesize=False)
+    # "I am" is a name cue, but the name is already answered
+    result = process_turn("slots-1", "I am staying near the temple", confidence=0.99, synthesize=False)
+    assert result["fields"]["name"] == "Ravi Kumar"
+    assert result["fields"]["address"] == "I am staying near the temple"
+
+    # Nothing usable at all: the address question is asked again
+    session = get_session("slots-1")
+    session["current_field"] = "address"
+    SESSION_STORE.save("slots-1", session)
+    result = process_turn("slots-1", "   ", confidence=0.99, synthesize=False)
+    assert result["assistant_text"] == ERROR_MESSAGES["en"]["address"]
+    reset_session("slots-1")
+
+
+if __name__ == "__main__":
+    test_extract_slots()
+    test_unmatched_text_is_residual()
+    test_text_before_address_cue_is_kept()
+    test_short_phone_number_is_not_pay()
+    test_cue_for_answered_field_is_direct_answer()
+    print("✅ ALL TESTS PASSED!")
@@ -3,115 +3,219 @@
 import os
 import base64
 import json
-from google.cloud import speech_v1p1beta1 as speech
-from google.oauth2 import service_account
+import logging
+from dataclasses import dataclass, field
+from typing import List, Tuple
+import threading
 from dotenv import load_dotenv
 
+from admission import LIMITERS
+from resilience import (
+    BREAKERS, HedgePool, TranscriptionError, ServiceError, check_deadline, hedged, retrying,
+)
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Per-request timeout; the turn deadline can make it shorter
+ASR_TIMEOUT_S = float(os.getenv("ASR_TIMEOUT_S", "5"))
+# A request still unanswered after this long is sent again, and the first reply wins
+ASR_HEDGE_AFTER_S = float(os.getenv("ASR_HEDGE_AFTER_S", "2"))
+ASR_ATTEMPTS = int(os.getenv("ASR_ATTEMPTS", "2"))
+
+# A request and its hedge for every transcription the ASR limiter lets run at once
+_hedge_pool = HedgePool(2 * LIMITERS["asr"].max_limit, name="asr-hedge")
+
+
+@dataclass
+class TranscriptionResult:
+    """Recognizer output for one utterance."""
+    text: str
+    confidence: float = 0.0  # 0.0 when the recognizer gave no score
+    alternatives: List[str] = field(default_factory=list)  # Other candidate transcripts, best first
+    words: List[Tuple[str, float, float]] = field(default_factory=list)  # (word, start_s, end_s)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _load_credentials():
+    """Service account credentials from GOOGLE_CREDENTIALS_BASE64 or GOOGLE_APPLICATION_CREDENTIALS."""
+    from google.oauth2 import service_account
+
+    # PRIORITY 1: Base64 string (for Production/Railway)
+    credentials_base64 = os.getenv("GOOGLE_CREDENTIALS_BASE64")
+
+    if credentials_base64:
+        try:
+            # Decode base64 to JSON string
+            credentials_json = base64.b64decode(credentials_base64).decode("utf-8")
+            # Parse JSON string to dict
+            credentials_dict = json.loads(credentials_json)
+            # Create credentials object
+            credentials = service_account.Credentials.from_service_account_info(credentials_dict)
+            logger.debug("Using Base64 credentials")
+            return credentials
+        except Exception as e:
+            logger.error("Failed to decode base64 credentials: %s", e)
+            raise RuntimeError(f"Base64 decode error: {str(e)}")
 
-def transcribe_audio(file_path: str, language_code: str = "en-IN") -> str:
+    # PRIORITY 2: File path (for Local Development)
+    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if not credentials_path:
+        logger.warning("GOOGLE_APPLICATION_CREDENTIALS not set")
+        # Debug info: explicitly state that Base64 var was also missing
+        raise RuntimeError("Credentials missing (Base64 var not set, File path not set)")
+
+    if not os.path.exists(credentials_path):
+        logger.warning("Credentials file not found: %s", credentials_path)
+        # Debug info: explicitly state status of both methods
+        raise RuntimeError(f"Config error: Base64 var missing, File '{credentials_path}' not found")
+
+    logger.debug("Using credentials file: %s", credentials_path)
+    return service_account.Credentials.from_service_account_file(credentials_path)
+
+
+def get_speech_client():
+    """
+    Google Speech client, created on first use and shared by all requests.
+
+    The SDK takes a few hundred milliseconds to import, so it is loaded here
+    rather than when the module is imported.
+
+    Raises:
+        RuntimeError: If no usable credentials are configured
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.cloud import speech_v1p1beta1 as speech
+                _client = speech.SpeechClient(credentials=_load_credentials())
+    return _client
+
+
+def _is_transient(error: Exception) -> bool:
+    """Errors worth retrying: timeouts, throttling and server-side failures."""
+    from google.api_core import exceptions
+
+    return isinstance(error, (
+        TimeoutError,
+        exceptions.DeadlineExceeded,
+        exceptions.ServiceUnavailable,
+        exceptions.InternalServerError,
+        exceptions.TooManyRequests,
+        exceptions.GatewayTimeout,
+    ))
+
+
+def transcribe_audio(file_path: str, language_code: str = "en-IN",
+                     sample_rate_hertz: int = 48000) -> TranscriptionResult:
     """
     Transcribe audio file using Google Cloud Speech-to-Text API.
     Optimized for IVR systems with telephony model and multi-language support.
-    
+
+    Each request times out after ASR_TIMEOUT_S (or sooner, if the turn's
+    deadline is closer); a slow request is hedged with a second one after
+    ASR_HEDGE_AFTER_S, and transient failures are retried while time remains.
+
     Args:
         file_path: Path to audio file (webm, wav, mp3, etc.)
         language_code: Language code for transcription (en-IN, hi-IN, ta-IN, etc.)
-        
+        sample_rate_hertz: Audio sample rate (48000 for web audio, 8000 for phone calls)
+
     Returns:
-        Transcribed text
-        
+        TranscriptionResult with text, confidence, alternatives and word timings;
+        text is empty when nothing was recognized
+
     Raises:
         FileNotFoundError: If audio file doesn't exist
-        RuntimeError: If transcription fails
+        TranscriptionError: If the speech service is unavailable, failed or timed out
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
     try:
-        # Load Google Cloud credentials
-        # PRIORITY 1: Base64 string (for Production/Railway)
-        credentials_base64 = os.getenv("GOOGLE_CREDENTIALS_BASE64")
-        
-        if credentials_base64:
-            try:
-                # Decode base64 to JSON string
-                credentials_json = base64.b64decode(credentials_base64).decode("utf-8")
-                # Parse JSON string to dict
-                credentials_dict = json.loads(credentials_json)
-                # Create credentials object
-                credentials = service_account.Credentials.from_service_account_info(credentials_dict)
-                print("[TRANSCRIBE] Using Base64 credentials")
-            except Exception as e:
-                print(f"[TRANSCRIBE ERROR] Failed to decode base64 credentials: {str(e)}")
-                return f"[Transcription unavailable - Base64 decode error: {str(e)}]"
-        else:
-            # PRIORITY 2: File path (for Local Development)
-            credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-            if not credentials_path:
-                print("[TRANSCRIBE WARNING] GOOGLE_APPLICATION_CREDENTIALS not set")
-                # Debug info: explicitly state that Base64 var was also missing
-                return "[Transcription unavailable - Credentials missing (Base64 var not set, File path not set)]"
-            
-            if not os.path.exists(credentials_path):
-                print(f"[TRANSCRIBE WARNING] Credentials file not found: {credentials_path}")
-                # Debug info: explicitly state status of both methods
-                return f"[Transcription unavailable - Config error: Base64 var missing, File '{credentials_path}' not found]"
-            
-            credentials = service_account.Credentials.from_service_account_file(credentials_path)
-            print(f"[TRANSCRIBE] Using credentials file: {credentials_path}")
-
-        client = speech.SpeechClient(credentials=credentials)
-        
-        # Read audio file
-        with open(file_path, "rb") as audio_file:
-            content = audio_file.read()
-        
-        audio = speech.RecognitionAudio(content=content)
-        
-        # Detect audio format from file extension
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        # Map file extensions to Google Cloud audio encodings
-        encoding_map = {
-            ".webm": speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-            ".wav": speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            ".mp3": speech.RecognitionConfig.AudioEncoding.MP3,
-            ".ogg": speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
-        }
-        
-        encoding = encoding_map.get(file_ext, speech.RecognitionConfig.AudioEncoding.WEBM_OPUS)
-        
-        # Configure recognition with specified language
-        config = speech.RecognitionConfig(
-            encoding=encoding,
-            sample_rate_hertz=48000,  # Common sample rate for web audio
-            language_code=language_code,  # Use specified language
-            use_enhanced=True,  # Enhanced model for better accuracy
-            enable_automatic_punctuation=True,
-            # Alternative candidates for better accuracy
-            max_alternatives=1,
-        )
-        
-        print(f"[TRANSCRIBE] Processing {file_path} with language: {language_code}")
-        
-        # Perform transcription
-        response = client.recognize(config=config, audio=audio)
-        
-        # Extract text from response
-        if response.results and len(response.results) > 0:
-            transcript = response.results[0].alternatives[0].transcript.strip()
-            print(f"[TRANSCRIBE] Result: '{transcript}'")
-            return transcript
-        else:
-            print("[TRANSCRIBE] No transcription results returned")
-            return ""
-            
-    except FileNotFoundError as e:
-        print(f"[TRANSCRIBE ERROR] {str(e)}")
-        return "[Transcription unavailable - File error]"
+        client = get_speech_client()
+    except RuntimeError as e:
+        raise TranscriptionError("google_asr", f"unavailable - {e}") from e
+
+    # Imported with the client above; already loaded
+    from google.api_core import exceptions
+    from google.cloud import speech_v1p1beta1 as speech
+
+    # Read audio file
+    with open(file_path, "rb") as audio_file:
+        content = audio_file.read()
+
+    audio = speech.RecognitionAudio(content=content)
+
+    # Detect audio format from file extension
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    # Map file extensions to Google Cloud audio encodings
+    encoding_map = {
+        ".webm": speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+        ".wav": speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        ".mp3": speech.RecognitionConfig.AudioEncoding.MP3,
+        ".ogg": speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
+    }
+
+    encoding = encoding_map.get(file_ext, speech.RecognitionConfig.AudioEncoding.WEBM_OPUS)
+
+    # Configure recognition with specified language
+    config = speech.RecognitionConfig(
+        encoding=encoding,
+        sample_rate_hertz=sample_rate_hertz,
+        language_code=language_code,  # Use specified language
+        use_enhanced=True,  # Enhanced model for better accuracy
+        enable_automatic_punctuation=True,
+        # Alternative candidates for better accuracy
+        max_alternatives=3,
+        enable_word_time_offsets=True,
+    )
+
+    def recognize():
+        timeout = min(check_deadline("google_asr"), ASR_TIMEOUT_S)
+        try:
+            return hedged(
+                lambda: client.recognize(config=config, audio=audio, timeout=timeout),
+                hedge_after=ASR_HEDGE_AFTER_S, timeout=timeout, pool=_hedge_pool,
+            )
+        except TimeoutError:
+            # Cut short by the turn's deadline: not the service's fault, and not worth a retry
+            check_deadline("google_asr")
+            raise
+
+    try:
+        # Undecodable audio is the caller's problem, not a sign the service is down
+        with BREAKERS["google_asr"].guard(ignore=(exceptions.InvalidArgument,)):
+            for attempt in retrying(_is_transient, ASR_ATTEMPTS):
+                with attempt:
+                    response = recognize()
+    except ServiceError as e:
+        raise TranscriptionError("google_asr", str(e)) from e
     except Exception as e:
-        print(f"[TRANSCRIBE ERROR] {str(e)}")
-        # Return a helpful fallback message instead of crashing
-        return f"[Transcription error: {str(e)[:100]}]"
+        logger.warning("Transcription failed: %s", e, extra={"language": language_code})
+        raise TranscriptionError("google_asr", str(e)[:200]) from e
+
+    # Extract text from response
+    if response.results and len(response.results) > 0:
+        # Long utterances come back as several results; join their best alternatives
+        best = [result.alternatives[0] for result in response.results if result.alternatives]
+        transcript = " ".join(alt.transcript.strip() for alt in best).strip()
+        confidence = min(alt.confidence for alt in best) if best else 0.0
+        alternatives = [alt.transcript.strip() for alt in response.results[0].alternatives[1:]]
+        words = [
+            (w.word, w.start_time.total_seconds(), w.end_time.total_seconds())
+            for alt in best for w in alt.words
+        ]
+        logger.debug("Transcription result", extra={
+            "language": language_code, "transcript": transcript, "confidence": confidence,
+        })
+        return TranscriptionResult(transcript, confidence, alternatives, words)
+
+    logger.info("No transcription results returned", extra={"language": language_code})
+    return TranscriptionResult("")
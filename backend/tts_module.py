@@ -1,12 +1,59 @@
 from dotenv import load_dotenv
 
+import os
 import tempfile
-from openai import OpenAI
+import threading
+
+from resilience import BREAKERS, SynthesisError, ServiceError, check_deadline, retrying
 
 load_dotenv()  # <-- loads .env file
 
+# Per-request timeout; the turn deadline can make it shorter
+OPENAI_TIMEOUT_S = float(os.getenv("OPENAI_TIMEOUT_S", "10"))
+OPENAI_ATTEMPTS = int(os.getenv("OPENAI_ATTEMPTS", "2"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """OpenAI client, created on first use so importing this module stays cheap."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                # Retries are ours (see _speech), so they respect the turn deadline
+                _client = OpenAI(timeout=OPENAI_TIMEOUT_S, max_retries=0)
+    return _client
+
+
+def _is_transient(error: Exception) -> bool:
+    import openai
+
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+
+def _speech(text: str, voice: str, **options) -> bytes:
+    """Audio bytes for text from OpenAI's TTS model, with timeout, retries and the breaker."""
+    try:
+        client = get_client()
+        with BREAKERS["openai"].guard():
+            for attempt in retrying(_is_transient, OPENAI_ATTEMPTS):
+                with attempt:
+                    timeout = min(check_deadline("openai"), OPENAI_TIMEOUT_S)
+                    response = client.with_options(timeout=timeout).audio.speech.create(
+                        model="gpt-4o-mini-tts",
+                        voice=voice,
+                        input=text,
+                        **options
+                    )
+                    return response.read()
+    except ServiceError as e:
+        raise SynthesisError("openai", str(e)) from e
+    except Exception as e:
+        raise SynthesisError("openai", f"TTS generation failed: {str(e)}") from e
 
-client = OpenAI()
 
 def synthesize_speech(text: str, voice: str = "alloy") -> str:
     """
@@ -18,21 +65,28 @@ def synthesize_speech(text: str, voice: str = "alloy") -> str:
     
     Returns:
         str: Path to generated mp3 audio file.
+
+    Raises:
+        SynthesisError: If OpenAI failed, timed out or its breaker is open.
     """
-    try:
-        # Ask OpenAI to create a TTS speech stream
-        response = client.audio.speech.create(
-            model="gpt-4o-mini-tts",
-            voice=voice,
-            input=text
-        )
+    audio = _speech(text, voice)
 
-        # Make a temporary .mp3 file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-            fp.write(response.read())
-            file_path = fp.name
+    # Make a temporary .mp3 file
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
+        fp.write(audio)
+        file_path = fp.name
 
-        return file_path
+    return file_path
 
-    except Exception as e:
-        raise RuntimeError(f"TTS generation failed: {str(e)}")
+
+def synthesize_pcm(text: str, voice: str = "alloy") -> bytes:
+    """
+    Convert text to raw speech samples for streaming to phone calls.
+
+    Returns:
+        bytes: 24 kHz, 16-bit little-endian mono PCM.
+
+    Raises:
+        SynthesisError: If OpenAI failed, timed out or its breaker is open.
+    """
+    return _speech(text, voice, response_format="pcm")
@@ -0,0 +1,45 @@
+"""Checking that phone calls really come from Twilio.
+
+The voice webhook is signed by Twilio with the account's auth token
+(X-Twilio-Signature over the full URL and the sorted form parameters). The
+TwiML it answers with hands the media stream a per-call token, an HMAC of
+the call SID, caller number and language, which the stream checks before
+greeting the caller. Without it anyone could open /media-stream with any
+`caller` parameter and resume that number's saved answers.
+
+Both checks use TWILIO_AUTH_TOKEN; when it is not set, every call is refused.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
+
+
+def request_signature(url: str, params: dict, auth_token: str) -> str:
+    """Twilio's X-Twilio-Signature for a webhook request."""
+    payload = url + "".join(key + str(params[key]) for key in sorted(params))
+    digest = hmac.new(auth_token.encode("utf-8"), payload.encode("utf-8"), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def valid_request(url: str, params: dict, signature: str) -> bool:
+    """True if the webhook request was signed by Twilio."""
+    if not TWILIO_AUTH_TOKEN or not signature:
+        return False
+    return hmac.compare_digest(request_signature(url, params, TWILIO_AUTH_TOKEN), signature)
+
+
+def stream_token(call_sid: str, caller: str, language: str) -> str:
+    """Token tying a media stream to the call the webhook answered."""
+    message = f"{call_sid}|{caller}|{language}"
+    return hmac.new(TWILIO_AUTH_TOKEN.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def valid_stream(call_sid: str, caller: str, language: str, token: str) -> bool:
+    """True if the stream's parameters are the ones the webhook handed out."""
+    if not TWILIO_AUTH_TOKEN or not token:
+        return False
+    return hmac.compare_digest(stream_token(call_sid, caller, language), token)
@@ -0,0 +1,101 @@
+"""Server-side voice activity detection for streamed call audio.
+
+Works on 16-bit PCM in 20 ms frames. The speech threshold follows the
+line's background noise, so the same settings work on quiet and noisy calls.
+"""
+
+from collections import deque
+
+import numpy as np
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+class VoiceActivityDetector:
+    """
+    Adaptive energy VAD that reports speech onsets and finished utterances.
+
+    A frame is speech when its RMS energy exceeds both min_threshold and
+    snr_ratio times the running noise floor. onset_ms of consecutive speech
+    frames start an utterance; once it holds min_speech_ms of speech it is
+    reported as SPEECH_START (used for barge-in). end_silence_ms of
+    non-speech frames finish it (SPEECH_END with the utterance samples,
+    including pre_roll_ms of audio before the onset). Shorter bursts, such as
+    a cough or a click, are dropped without any event.
+    """
+
+    def __init__(self, sample_rate: int = 8000, frame_ms: int = 20,
+                 min_threshold: float = 300.0, snr_ratio: float = 3.0,
+                 onset_ms: int = 120, min_speech_ms: int = 250, end_silence_ms: int = 700,
+                 pre_roll_ms: int = 200, max_utterance_ms: int = 15000):
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.min_threshold = min_threshold
+        self.snr_ratio = snr_ratio
+        self.onset_frames = max(1, onset_ms // frame_ms)
+        self.min_speech_frames = max(self.onset_frames, min_speech_ms // frame_ms)
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.max_frames = max_utterance_ms // frame_ms
+        self.noise_floor = min_threshold / snr_ratio
+        self._pre_roll = deque(maxlen=max(self.onset_frames, pre_roll_ms // frame_ms))
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.reset()
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_threshold, self.noise_floor * self.snr_ratio)
+
+    def reset(self):
+        """Drop any partial utterance; the learned noise floor is kept."""
+        self.in_speech = False
+        self.started = False  # SPEECH_START reported for the current utterance
+        self._pre_roll.clear()
+        self._frames = []
+        self._onset = 0
+        self._voiced = 0
+        self._silence = 0
+
+    def feed(self, samples: np.ndarray):
+        """Add audio and return the list of (event, utterance) it produced."""
+        samples = np.concatenate((self._remainder, samples))
+        usable = len(samples) - len(samples) % self.frame_samples
+        self._remainder = samples[usable:]
+        if not usable:
+            return []
+
+        frames = samples[:usable].reshape(-1, self.frame_samples)
+        energies = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+        events = []
+        for frame, energy in zip(frames, energies):
+            is_speech = energy > self.threshold
+
+            if not self.in_speech:
+                self._pre_roll.append(frame)
+                if is_speech:
+                    self._onset += 1
+                else:
+                    self._onset = 0
+                    # Only silence updates the noise estimate
+                    self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(energy)
+                if self._onset >= self.onset_frames:
+                    self.in_speech = True
+                    self._frames = list(self._pre_roll)
+                    self._voiced = self._onset
+                    self._silence = 0
+                else:
+                    continue
+            else:
+                self._frames.append(frame)
+                self._voiced += int(is_speech)
+                self._silence = 0 if is_speech else self._silence + 1
+
+            if not self.started and self._voiced >= self.min_speech_frames:
+                self.started = True
+                events.append((SPEECH_START, None))
+            if self._silence >= self.end_silence_frames or len(self._frames) >= self.max_frames:
+                if self.started:
+                    events.append((SPEECH_END, np.concatenate(self._frames)))
+                self.reset()
+
+        return events
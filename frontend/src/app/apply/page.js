@@ -29,6 +29,19 @@ export default function Apply() {
   const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || "http://127.0.0.1:8000";
   const MAX_RETRIES = 3;
 
+  // Prompts come from /audio on the backend, or as full URLs from a storage bucket
+  const audioSrc = (url) => (/^https?:\/\//.test(url) ? url : `${BACKEND_URL}${url}`);
+
+  // Lets a dropped application continue where it left off; cleared once it finishes
+  const RESUME_TOKEN_KEY = "ivrResumeToken";
+  const rememberResumeToken = (token) => {
+    if (token) {
+      localStorage.setItem(RESUME_TOKEN_KEY, token);
+    } else {
+      localStorage.removeItem(RESUME_TOKEN_KEY);
+    }
+  };
+
   const handleStart = async () => {
     try {
       setError("");
@@ -71,6 +84,10 @@ export default function Apply() {
       const startFormData = new FormData();
       startFormData.append("session_id", sid);
       startFormData.append("language", selectedLanguage); // Send selected language
+      const resumeToken = localStorage.getItem(RESUME_TOKEN_KEY);
+      if (resumeToken) {
+        startFormData.append("resume_token", resumeToken);
+      }
 
       console.log("[DEBUG] Fetching initial question (language:", selectedLanguage, ")");
       const startResponse = await fetch(`${BACKEND_URL}/ivr/start`, {
@@ -79,11 +96,14 @@ export default function Apply() {
       });
 
       if (!startResponse.ok) {
-        throw new Error(`Failed to get initial question: ${startResponse.status}`);
+        // 503 when over capacity carries a "please call back" message
+        const busy = await startResponse.json().catch(() => null);
+        throw new Error(busy?.detail || `Failed to get initial question: ${startResponse.status}`);
       }
 
       const startData = await startResponse.json();
       console.log("[DEBUG] Initial question received:", startData);
+      rememberResumeToken(startData.resume_token);
 
       setStarted(true);
       setAssistantText(startData.assistant_text);
@@ -95,7 +115,7 @@ export default function Apply() {
       // Play the welcome audio
       if (startData.audio_url) {
         try {
-          const audio = new Audio(`${BACKEND_URL}${startData.audio_url}`);
+          const audio = new Audio(audioSrc(startData.audio_url));
           audio.onerror = () => {
             console.warn("Failed to load audio");
             setQuestionPlaying(false);
@@ -257,6 +277,7 @@ export default function Apply() {
       setAssistantText(json.assistant_text);
       setFields(json.fields || {});
       setFinished(json.finished || false);
+      rememberResumeToken(json.resume_token);
       setRetryCount(0);
       setLoading(false);
 
@@ -264,7 +285,7 @@ export default function Apply() {
       if (json.audio_url) {
         setQuestionPlaying(true);
         try {
-          const audio = new Audio(`${BACKEND_URL}${json.audio_url}`);
+          const audio = new Audio(audioSrc(json.audio_url));
           audio.onerror = () => {
             console.warn("Failed to load audio");
             setQuestionPlaying(false);